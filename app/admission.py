@@ -0,0 +1,125 @@
+"""
+app/admission.py
+Admission control for the chat endpoints.
+
+- At most MAX_CONCURRENT_REQUESTS graph runs execute at once; up to MAX_QUEUED_REQUESTS more wait.
+- Beyond that, or after waiting ADMISSION_QUEUE_TIMEOUT seconds, requests get 429 + Retry-After.
+- Turns of the same thread_id run one at a time, in arrival order (asyncio.Lock is FIFO),
+  so they never race on the checkpointer; different threads run in parallel.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List
+
+from fastapi import HTTPException
+
+from app.config import Config
+from app.metrics import requests_in_flight, requests_rejected
+
+logger = logging.getLogger(__name__)
+
+
+class Ticket:
+    """An admitted request: holds its thread lock and one concurrency slot until released"""
+
+    def __init__(self, thread_id: str):
+        self.thread_id = thread_id
+        self.released = False
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrent: int = Config.MAX_CONCURRENT_REQUESTS,
+        max_queued: int = Config.MAX_QUEUED_REQUESTS,
+        queue_timeout: float = Config.ADMISSION_QUEUE_TIMEOUT,
+        retry_after: int = Config.ADMISSION_RETRY_AFTER,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.slots = asyncio.Semaphore(max_concurrent)
+        # thread_id -> [lock, number of requests holding or waiting for it]
+        self.thread_locks: Dict[str, List] = {}
+        self.in_flight = 0
+        self.active = 0
+        self.rejected = 0
+
+    def _reject(self, reason: str):
+        self.rejected += 1
+        requests_rejected.inc(reason=reason)
+        logger.warning(f"⚠️ Request rejected: {reason}")
+        raise HTTPException(
+            status_code=429,
+            detail=f"Server busy ({reason}), please retry later.",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    def _update_gauges(self):
+        requests_in_flight.set(self.active, state="active")
+        requests_in_flight.set(self.in_flight - self.active, state="queued")
+
+    def _thread_lock(self, thread_id: str) -> asyncio.Lock:
+        entry = self.thread_locks.setdefault(thread_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        return entry[0]
+
+    def _drop_thread_lock(self, thread_id: str):
+        entry = self.thread_locks[thread_id]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self.thread_locks[thread_id]
+
+    async def acquire(self, thread_id: str) -> Ticket:
+        """Waits for the thread's turn and a free slot; raises 429 if the queue is full or the wait times out"""
+        if self.in_flight >= self.max_concurrent + self.max_queued:
+            self._reject("queue full")
+        self.in_flight += 1
+        self._update_gauges()
+        lock = self._thread_lock(thread_id)
+        lock_acquired = False
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await lock.acquire()
+                lock_acquired = True
+                await self.slots.acquire()
+        except BaseException as e:
+            # Timed out or the client went away while waiting
+            if lock_acquired:
+                lock.release()
+            self._drop_thread_lock(thread_id)
+            self.in_flight -= 1
+            self._update_gauges()
+            if isinstance(e, TimeoutError):
+                self._reject("queue timeout")
+            raise
+        self.active += 1
+        self._update_gauges()
+        return Ticket(thread_id)
+
+    def release(self, ticket: Ticket):
+        """Frees the slot and the thread lock (safe to call more than once)"""
+        if ticket.released:
+            return
+        ticket.released = True
+        self.active -= 1
+        self.in_flight -= 1
+        self._update_gauges()
+        self.slots.release()
+        self.thread_locks[ticket.thread_id][0].release()
+        self._drop_thread_lock(ticket.thread_id)
+
+    def stats(self) -> Dict:
+        return {
+            "active": self.active,
+            "queued": self.in_flight - self.active,
+            "rejected": self.rejected,
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "threads": len(self.thread_locks),
+        }
+
+
+admission = AdmissionController()
@@ -1,14 +1,30 @@
-from langchain_core.prompts import ChatPromptTemplate
-from pydantic import BaseModel, Field
+from langchain_core.messages import AIMessage
 from app.state import DeepAgentState
-from app.utils import get_llm
-from typing import Literal
+from app.budget import current_budget, usage_snapshot
+from app.agents.workers import PARALLEL_WORKERS
+from typing import List
 
-class Router(BaseModel):
-    """Worker to route to"""
-    next_worker: Literal["BookingAgent", "SupportAgent", "CrisisAgent"] = Field(description="The worker to route to next")
+def ready_steps(state: DeepAgentState) -> List[int]:
+    """
+    Steps that can be dispatched together, starting at the current step.
+    A following step joins the batch while it is parallel-safe and depends only on
+    steps finished before the batch. Steps already completed (e.g. on a retry) are skipped.
+    """
+    start = state['current_step_index']
+    step_workers = state['step_workers']
+    dependencies = state.get('step_dependencies') or []
+    results = state.get('step_results') or {}
+    
+    batch = [start]
+    if step_workers[start] in PARALLEL_WORKERS:
+        for index in range(start + 1, len(step_workers)):
+            depends_on = dependencies[index] if index < len(dependencies) else [index - 1]
+            if step_workers[index] not in PARALLEL_WORKERS or any(d >= start for d in depends_on):
+                break
+            batch.append(index)
+    return [index for index in batch if not results.get(index, {}).get("task_complete")] or [start]
 
-def orchestrator_node(state: DeepAgentState):
+async def orchestrator_node(state: DeepAgentState):
     print("---ORCHESTRATOR---")
     plan = state['plan']
     current_step_index = state['current_step_index']
@@ -17,31 +33,27 @@ def orchestrator_node(state: DeepAgentState):
     if current_step_index >= len(plan):
         return {"next_worker": "FINISH"}
     
-    current_step = plan[current_step_index]
-    
-    llm = get_llm()
-    structured_llm = llm.with_structured_output(Router)
-    
-    system_prompt = """You are an Orchestrator.
-    Your job is to decide which worker should perform the current step of the plan.
-    
-    Current Plan:
-    {plan}
-    
-    Current Step:
-    {current_step}
-    
-    Workers:
-    - BookingAgent: For checking availability, booking slots, confirming emails related to meetings.
-    - SupportAgent: For answering FAQs, general questions, issues.
-    - CrisisAgent: For human handoff, high severity issues, or when user demands to talk to a person.
-    """
-    
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-    ])
-    
-    chain = prompt | structured_llm
-    result = chain.invoke({"plan": "\n".join(plan), "current_step": current_step})
-    
-    return {"next_worker": result.next_worker}
+    # Out of budget: stop before dispatching more work
+    budget = current_budget.get()
+    reason = budget.exhausted() if budget else None
+    if reason:
+        results = state.get('step_results') or {}
+        remaining = [step for index, step in enumerate(plan)
+                     if index >= current_step_index and not results.get(index, {}).get("task_complete")]
+        print(f"Budget exhausted ({reason}), stopping with {len(remaining)} step(s) left")
+        note = ("I've reached the processing limit for this request, so I stopped before: "
+                + "; ".join(remaining) + ". Send the request again (or split it up) and I'll continue.")
+        return {
+            "next_worker": "FINISH",
+            "messages": [AIMessage(content=note)],
+            "task_complete": True,
+            "usage": usage_snapshot(),
+        }
+    
+    # Every turn starts at the Planner, which assigns a validated worker to each step: a plain lookup
+    step_workers = state['step_workers']
+    batch = ready_steps(state)
+    if len(batch) > 1:
+        # Independent steps: graph fans out with Send, one branch per step
+        return {"next_worker": "PARALLEL", "active_steps": batch}
+    return {"next_worker": step_workers[batch[0]], "active_steps": batch}
@@ -0,0 +1,149 @@
+"""
+app/agents/plan_cache.py
+Plan cache for the Planner: skips the planning LLM call for messages that match an earlier plan shape.
+
+The key is the message reduced to a template (case/whitespace/punctuation normalized, slot values
+such as emails, dates, times and weekdays replaced by typed placeholders) plus a fingerprint of the
+retrieved memory context. Cached steps keep the slots as positional markers and are re-bound to
+the new message's values on a hit. The whole cache is dropped when the worker definitions change.
+"""
+
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.config import Config
+from app.metrics import cache_hits, cache_misses
+
+logger = logging.getLogger(__name__)
+
+# Order matters: earlier patterns claim their text first (e.g. a date before a bare time)
+SLOT_PATTERNS: List[Tuple[str, re.Pattern]] = [
+    ("email", re.compile(r"\b[\w.+-]+@[\w-]+\.[\w.-]+\b")),
+    ("url", re.compile(r"\bhttps?://\S+")),
+    ("date", re.compile(
+        r"\b\d{4}-\d{2}-\d{2}\b|\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b"
+        r"|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.? \d{1,2}(?:st|nd|rd|th)?\b",
+        re.IGNORECASE,
+    )),
+    ("time", re.compile(r"\b\d{1,2}(?::\d{2})? ?(?:am|pm)\b|\b\d{1,2}:\d{2}\b", re.IGNORECASE)),
+    ("day", re.compile(
+        r"\b(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday|today|tomorrow)\b",
+        re.IGNORECASE,
+    )),
+]
+
+_MARKER = "\x00{}\x00"
+_NON_WORD = re.compile(r"[^\w<>]+")
+
+
+def extract_template(message: str) -> Tuple[str, List[str]]:
+    """Returns the canonical template of a message and its slot values, in order of appearance"""
+    spans = []
+    for name, pattern in SLOT_PATTERNS:
+        for match in pattern.finditer(message):
+            if not any(start < match.end() and match.start() < end for start, end, _ in spans):
+                spans.append((match.start(), match.end(), name))
+    spans.sort()
+
+    parts, slots, position = [], [], 0
+    for start, end, name in spans:
+        parts.append(message[position:start])
+        parts.append(f"<{name}>")
+        slots.append(message[start:end])
+        position = end
+    parts.append(message[position:])
+    template = _NON_WORD.sub(" ", "".join(parts).casefold()).strip()
+    return template, slots
+
+
+def fingerprint(text: str) -> str:
+    return hashlib.sha256(" ".join(text.split()).casefold().encode("utf-8")).hexdigest()[:16]
+
+
+def _slot_regex(value: str) -> re.Pattern:
+    return re.compile(r"(?<!\w)" + re.escape(value) + r"(?!\w)", re.IGNORECASE)
+
+
+class PlanCache:
+    """LRU + TTL cache of plan steps keyed by message template and memory-context fingerprint"""
+
+    def __init__(self, max_size: int = Config.PLAN_CACHE_SIZE, ttl: int = Config.PLAN_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        # key -> (steps with slot markers, created_at); most recently used last
+        self.entries: "OrderedDict[str, Tuple[List[Dict], float]]" = OrderedDict()
+        self.workers_fingerprint: Optional[str] = None
+        self.counters = {"hits": 0, "misses": 0, "uncacheable": 0, "invalidations": 0}
+
+    def _check_workers(self, workers: str):
+        """Drops every entry when the worker definitions differ from the ones the plans were made for"""
+        current = fingerprint(workers)
+        if current != self.workers_fingerprint:
+            if self.entries:
+                logger.info("♻️ Worker definitions changed, clearing plan cache")
+                self.counters["invalidations"] += 1
+            self.entries.clear()
+            self.workers_fingerprint = current
+
+    def get(self, message: str, context: str, workers: str) -> Optional[List[Dict]]:
+        """Cached steps (dicts with description / worker / depends_on) re-bound to this message, or None"""
+        self._check_workers(workers)
+        template, slots = extract_template(message)
+        key = f"{template}|{fingerprint(context)}"
+        entry = self.entries.get(key)
+        if entry is None or time.time() - entry[1] > self.ttl:
+            self.entries.pop(key, None)
+            self.counters["misses"] += 1
+            cache_misses.inc(cache="plan")
+            return None
+        self.entries.move_to_end(key)
+        self.counters["hits"] += 1
+        cache_hits.inc(cache="plan")
+        steps = []
+        for step in entry[0]:
+            description = step["description"]
+            for index, value in enumerate(slots):
+                description = description.replace(_MARKER.format(index), value)
+            steps.append({**step, "description": description})
+        return steps
+
+    def put(self, message: str, context: str, workers: str, steps: List[Dict]):
+        """
+        Stores steps with this message's slot values replaced by markers.
+        Plans that do not quote every slot verbatim (e.g. "3pm" rewritten as "15:00") are not cached,
+        since their slot values could not be re-bound.
+        """
+        self._check_workers(workers)
+        template, slots = extract_template(message)
+        stored = []
+        for step in steps:
+            description = step["description"]
+            # Longest values first so "2024-05-01" is not partially claimed by a shorter slot
+            for index, value in sorted(enumerate(slots), key=lambda item: -len(item[1])):
+                description = _slot_regex(value).sub(_MARKER.format(index), description)
+            stored.append({**step, "description": description})
+        bound = "".join(step["description"] for step in stored)
+        if any(_MARKER.format(index) not in bound for index in range(len(slots))):
+            self.counters["uncacheable"] += 1
+            return
+        key = f"{template}|{fingerprint(context)}"
+        self.entries[key] = (stored, time.time())
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hit_rate": round(self.counters["hits"] / lookups, 3) if lookups else 0.0,
+        }
+
+
+plan_cache = PlanCache() if Config.PLAN_CACHE_ENABLED else None
@@ -1,13 +1,61 @@
 from langchain_core.prompts import ChatPromptTemplate
-from pydantic import BaseModel, Field
-from typing import List
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal
 from app.state import DeepAgentState
-from app.utils import get_llm
-from app.memory import PineconeMemory
+from app.utils import get_llm, register_chain
+from app.batching import batched_invoke
+from app.memory import memory_subsystem
+from app.context import collect_summary_update, start_summary_update
+from langgraph.config import get_config
+from app.agents.workers import WORKER_NAMES, describe_workers
+from app.agents.plan_cache import plan_cache
+from app.budget import usage_snapshot
+from app.prefetch import schedule_prefetch
+from app.recording import record_llm
+
+class PlanStep(BaseModel):
+    """A single step of the plan and the worker assigned to it"""
+    description: str = Field(description="What needs to be done in this step")
+    worker: Literal[WORKER_NAMES] = Field(description="The worker that performs this step")
+    depends_on: List[int] = Field(
+        default_factory=list,
+        description="0-based indices of earlier steps whose results this step needs. Empty if independent."
+    )
 
 class Plan(BaseModel):
     """Plan to follow to answer the user request"""
-    steps: List[str] = Field(description="List of sequential steps to follow")
+    steps: List[PlanStep] = Field(description="List of sequential steps to follow")
+
+    @model_validator(mode="after")
+    def drop_invalid_dependencies(self):
+        # Only earlier steps can be dependencies; anything else would deadlock the fan-out
+        for index, step in enumerate(self.steps):
+            step.depends_on = sorted({d for d in step.depends_on if 0 <= d < index})
+        return self
+
+SYSTEM_PROMPT = """You are a Planner for a B2B AI Chat Assistant. 
+    Your job is to break down the user's request into a sequential list of steps,
+    and assign each step to the worker that should perform it.
+    For each step, list the earlier steps it depends on; steps with no dependencies
+    on each other (e.g. answering an FAQ and checking availability) can run in parallel.
+    
+    Consider the user's history/context:
+    {context}
+    
+    Available Workers:
+    {workers}
+    
+    Create a concise plan.
+    """
+
+def build_planner_chain():
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", SYSTEM_PROMPT),
+        ("user", "{input}")
+    ])
+    return prompt | get_llm().with_structured_output(Plan)
+
+register_chain("planner", build_planner_chain)
 
 async def planner_node(state: DeepAgentState):
     print("---PLANNER---")
@@ -15,42 +63,48 @@ async def planner_node(state: DeepAgentState):
     user_id = state['user_id']
     user_message = messages[-1].content
     
-    # Search memory
-    memory = PineconeMemory()
+    # Search memory (process-wide client, pooled connections)
     try:
+        memory = await memory_subsystem.aget()
+        if memory is None:
+            raise RuntimeError("memory unavailable")
         context = await memory.search_memory(user_id, user_message)
         context_str = "\n".join(context)
     except Exception as e:
         print(f"Memory search failed: {e}")
         context_str = "No memory available."
 
-    llm = get_llm()
-    structured_llm = llm.with_structured_output(Plan)
-    
-    system_prompt = """You are a Planner for a B2B AI Chat Assistant. 
-    Your job is to break down the user's request into a sequential list of steps.
-    
-    Consider the user's history/context:
-    {context}
-    
-    Available Workers:
-    1. BookingAgent: Can check availability, book meetings.
-    2. SupportAgent: Can search FAQs, answer general questions.
-    
-    Create a concise plan.
-    """
+    workers = describe_workers()
+    cached_steps = plan_cache.get(user_message, context_str, workers) if plan_cache else None
+    if cached_steps is not None:
+        print("Plan cache hit")
+        plan = Plan(steps=cached_steps)
+        record_llm("planner", plan)
+    else:
+        # Coalesced / rate-shaped with concurrent planning calls from other requests
+        plan = await batched_invoke("planner", {"context": context_str, "workers": workers, "input": user_message})
+        if plan_cache:
+            plan_cache.put(user_message, context_str, workers, [step.model_dump() for step in plan.steps])
     
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        ("user", "{input}")
-    ])
+    # Start calendar / FAQ lookups now so they overlap with the Orchestrator and worker LLM calls
+    schedule_prefetch([step.description for step in plan.steps], [step.worker for step in plan.steps], user_message)
     
-    chain = prompt | structured_llm
-    plan = chain.invoke({"context": context_str, "input": user_message})
+    # The summary update finished since the thread's last turn (if any) lands now; the next one runs
+    # in the background, off this turn's critical path, and lands on the following turn
+    thread_id = get_config()["configurable"]["thread_id"]
+    summary_update = collect_summary_update(thread_id, state)
+    start_summary_update(thread_id, {**state, **summary_update})
     
     return {
-        "plan": plan.steps, 
+        **summary_update,
+        "plan": [step.description for step in plan.steps],
+        "step_workers": [step.worker for step in plan.steps],
+        "step_dependencies": [step.depends_on for step in plan.steps],
         "current_step_index": 0,
+        "active_steps": [],
+        "step_results": {},
         "task_complete": False,
-        "scratchpad": {}
+        "scratchpad": {},
+        "step_retries": {},
+        "usage": usage_snapshot()
     }
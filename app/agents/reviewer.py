@@ -1,19 +1,83 @@
 from app.state import DeepAgentState
+from app.config import Config
+from app.budget import usage_snapshot
+from app.metrics import retry_counter
 from langchain_core.messages import AIMessage
+from typing import Dict, List
 
-def reviewer_node(state: DeepAgentState):
+def next_incomplete_step(state: DeepAgentState, skipped: List[int] = ()) -> int:
+    """First step at or after the current one that has not completed (or been skipped) yet"""
+    results = state.get('step_results') or {}
+    index = state['current_step_index']
+    while index < len(state['plan']) and (results.get(index, {}).get("task_complete") or index in skipped):
+        index += 1
+    return index
+
+def retry_or_skip(state: DeepAgentState, steps: List[int]) -> Dict:
+    """
+    Counts a retry for each failed step. Steps past MAX_STEP_RETRIES are skipped:
+    marked complete with an apology, so the run moves on instead of looping.
+    """
+    retries = {**(state.get('step_retries') or {})}
+    for index in steps:
+        retries[index] = retries.get(index, 0) + 1
+    skipped = [index for index in steps if retries[index] > Config.MAX_STEP_RETRIES]
+    retry_counter.inc(len(steps) - len(skipped), outcome="retry")
+    retry_counter.inc(len(skipped), outcome="skipped")
+    update = {"step_retries": retries}
+    if not skipped:
+        return {**update, "scratchpad": {**state['scratchpad'], "critique": "Previous attempt failed. Retry."}}
+    
+    plan = state['plan']
+    print(f"Skipping step(s) {skipped} after {Config.MAX_STEP_RETRIES} retries")
+    update["messages"] = [AIMessage(content=f"Sorry, I wasn't able to complete this step: {plan[index]}") for index in skipped]
+    update["step_results"] = {index: {"task_complete": True, "response": "", "skipped": True} for index in skipped}
+    if len(skipped) < len(steps):
+        # Other branches of the batch still get their retry
+        return {**update, "scratchpad": {**state['scratchpad'], "critique": "Previous attempt failed. Retry."}}
+    return {**update, "current_step_index": next_incomplete_step(state, skipped), "task_complete": True}
+
+def batch_status(state: DeepAgentState) -> str:
+    """Outcome of a parallel round: "complete", "question" (a branch needs user input) or "retry" """
+    results = state.get('step_results') or {}
+    pending = [results.get(i, {}) for i in state['active_steps'] if not results.get(i, {}).get("task_complete")]
+    if not pending:
+        return "complete"
+    if any("?" in result.get("response", "") for result in pending):
+        return "question"
+    return "retry"
+
+def is_parallel_round(state: DeepAgentState) -> bool:
+    return len(state.get('active_steps') or []) > 1
+
+async def reviewer_node(state: DeepAgentState):
     print("---REVIEWER---")
+    # Every worker round ends here, so this keeps the request's usage in state up to date
+    return {**review(state), "usage": usage_snapshot()}
+
+def review(state: DeepAgentState) -> Dict:
     task_complete = state['task_complete']
     current_step_index = state['current_step_index']
     plan = state['plan']
     
+    if is_parallel_round(state):
+        # Merge the branches: advance past every completed step, in plan order
+        status = batch_status(state)
+        if status == "complete":
+            return {"current_step_index": next_incomplete_step(state), "task_complete": True}
+        if status == "question":
+            return {"task_complete": False}
+        results = state.get('step_results') or {}
+        failed = [i for i in state['active_steps'] if not results.get(i, {}).get("task_complete")]
+        return {"task_complete": False, **retry_or_skip(state, failed)}
+    
     # Check if the last message is a question from the worker
     last_message = state['messages'][-1]
     is_question = "?" in last_message.content if hasattr(last_message, 'content') else False
     
     if task_complete:
-        # Success, move to next step
-        return {"current_step_index": current_step_index + 1}
+        # Success, move to next step (skipping any already finished in an earlier parallel round)
+        return {"current_step_index": next_incomplete_step(state)}
     
     if not task_complete and is_question:
         # Need user input, so we finish the run to wait for user
@@ -27,14 +91,17 @@ def reviewer_node(state: DeepAgentState):
         
     if not task_complete and not is_question:
         # Failure/Retrying
-        # Add critique
-        return {"scratchpad": {**state['scratchpad'], "critique": "Previous attempt failed. Retry."}}
+        # Add critique (or skip the step once its retries are used up)
+        return retry_or_skip(state, [current_step_index])
 
 def reviewer_conditional(state: DeepAgentState):
     task_complete = state['task_complete']
     current_step_index = state['current_step_index']
     plan = state['plan']
     
+    if is_parallel_round(state) and not task_complete:
+        return "END" if batch_status(state) == "question" else "Orchestrator"
+    
     # Check if the last message is a question
     last_message = state['messages'][-1]
     is_question = "?" in last_message.content
@@ -0,0 +1,33 @@
+# Workers the Orchestrator can dispatch to (node name -> capability description).
+# The graph, the planner schema and the prompts are all derived from this mapping.
+WORKERS = {
+    "BookingAgent": "For checking availability, booking slots, confirming emails related to meetings.",
+    "SupportAgent": "For answering FAQs, general questions, issues.",
+    "CrisisAgent": "For human handoff, high severity issues, or when user demands to talk to a person.",
+}
+
+WORKER_NAMES = tuple(WORKERS)
+
+# Workers whose independent steps may run concurrently (crisis handoff always runs alone)
+PARALLEL_WORKERS = {"BookingAgent", "SupportAgent"}
+
+
+def describe_workers(indent: str = "    ") -> str:
+    """Bullet list of workers for prompts"""
+    return f"\n{indent}".join(f"- {name}: {description}" for name, description in WORKERS.items())
+
+
+def worker_update(state, response_message, task_complete: bool):
+    """
+    State update returned by every worker.
+    Each step reports into step_results; the shared task_complete flag is only
+    written when the step runs alone, since parallel branches would conflict on it.
+    """
+    step_index = state['current_step_index']
+    update = {
+        "messages": [response_message],
+        "step_results": {step_index: {"task_complete": task_complete, "response": response_message.content}},
+    }
+    if len(state.get('active_steps') or []) <= 1:
+        update["task_complete"] = task_complete
+    return update
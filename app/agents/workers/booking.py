@@ -1,58 +1,16 @@
 from langchain_core.messages import AIMessage
 from app.state import DeepAgentState
-from app.utils import get_llm
+from app.agents.workers import worker_update
+from app.utils import get_llm, register_chain, get_chain
+from app.context import build_context
 from app.tools.booking_tool import booking_agent_tool
+from app.prefetch import prefetched_for_step
+from app.tracing import span
+from app.recording import run_tool
 
-def booking_node(state: DeepAgentState):
-    print("---BOOKING WORKER---")
-    plan = state['plan']
-    current_step_index = state['current_step_index']
-    scratchpad = state['scratchpad']
-    
-    # Handle edge case where index out of bounds (though orchestrator should prevent)
-    if current_step_index >= len(plan):
-        return {"task_complete": True}
+# Availability changes and bookings have side effects: never serve booking replies from the LLM cache
+register_chain("booking", lambda: get_llm(cached=False).bind_tools([booking_agent_tool]))
 
-    current_step = plan[current_step_index]
-    
-    tools = [booking_agent_tool]
-    llm = get_llm().bind_tools(tools)
-    
-    system_prompt = """You are a Booking Agent.
-    Your goal is to complete the current step of the plan, which involves checking availability or booking meetings.
-    
-    Current Step:
-    {current_step}
-    
-    Scratchpad (History of actions in this turn):
-    {scratchpad}
-    """
-    
-    messages = [
-        ("system", system_prompt.format(current_step=current_step, scratchpad=scratchpad)),
-    ] + state['messages']
-    
-    # Invoke LLM
-    result = llm.invoke(messages)
-    
-    task_complete = False
-    
-    if result.tool_calls:
-        tool_call = result.tool_calls[0]
-        # Execute tool
-        # We need to ensure we run custom async tools properly if they are async.
-        # booking_agent_tool is async def, so we should await it if we were in async context.
-        # However, LangGraph nodes are sync functions in this setup? 
-        # Wait, if we are in main.py: await graph.invoke(), then nodes can be async?
-        # But this function 'booking_node' is def, not async def.
-        # So we should run the tool synchronously?
-        # But booking_agent_tool is async.
-        # We need to bridge this.
-        # For now, let's use a helper to run async tool in sync context or make this node async.
-        # The graph supports async nodes. Let's make this async.
-        pass
-
-# Redefining as async to handle async tool
 async def booking_node(state: DeepAgentState):
     print("---BOOKING WORKER---")
     plan = state['plan']
@@ -64,8 +22,10 @@ async def booking_node(state: DeepAgentState):
 
     current_step = plan[current_step_index]
     
-    tools = [booking_agent_tool]
-    llm = get_llm().bind_tools(tools)
+    llm = get_chain("booking")
+    # Availability fetched in the background right after planning (date -> free slots)
+    slots = await prefetched_for_step(current_step_index, "slots")
+    availability = "\n".join(f"{date}: {', '.join(free) or 'fully booked'}" for date, free in slots.items()) or "Not checked yet."
     
     system_prompt = """You are a Booking Agent.
     Your goal is to complete the current step of the plan, which involves checking availability or booking meetings.
@@ -73,13 +33,15 @@ async def booking_node(state: DeepAgentState):
     Current Step:
     {current_step}
     
+    Available slots (already checked with the calendar):
+    {availability}
+    
     Scratchpad:
     {scratchpad}
     """
     
-    messages = [
-        ("system", system_prompt.format(current_step=current_step, scratchpad=scratchpad)),
-    ] + state['messages']
+    # System prompt + running summary + recent turns, within the model's token budget
+    messages = build_context(state, system_prompt.format(current_step=current_step, availability=availability, scratchpad=scratchpad))
     
     result = await llm.ainvoke(messages)
     
@@ -90,7 +52,8 @@ async def booking_node(state: DeepAgentState):
         print(f"Tool Request: {tool_call['name']}")
         
         # Invoke the async tool
-        tool_output = await booking_agent_tool.ainvoke(tool_call['args'])
+        with span("booking_agent_tool", kind="tool", args=sorted(tool_call['args'])):
+            tool_output = await run_tool(booking_agent_tool, tool_call['args'])
         
         print(f"Tool executed: booking_agent_tool -> {tool_output}")
         response_message = AIMessage(content=str(tool_output))
@@ -102,7 +65,4 @@ async def booking_node(state: DeepAgentState):
         else:
             task_complete = True
 
-    return {
-        "messages": [response_message],
-        "task_complete": task_complete
-    }
+    return worker_update(state, response_message, task_complete)
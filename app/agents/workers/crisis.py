@@ -1,17 +1,22 @@
 from langchain_core.messages import AIMessage
 from app.state import DeepAgentState
-from app.utils import get_llm
+from app.agents.workers import worker_update
+from app.utils import get_llm, register_chain, get_chain
+from app.context import build_context
 from app.tools.human_handoff_tool import human_handoff_tool
+from app.tracing import span
+from app.recording import run_tool
 
-def crisis_node(state: DeepAgentState):
+register_chain("crisis", lambda: get_llm().bind_tools([human_handoff_tool]))
+
+async def crisis_node(state: DeepAgentState):
     print("---CRISIS WORKER---")
     plan = state['plan']
     current_step_index = state['current_step_index']
     scratchpad = state['scratchpad']
     current_step = plan[current_step_index]
     
-    tools = [human_handoff_tool]
-    llm = get_llm().bind_tools(tools)
+    llm = get_chain("crisis")
     
     system_prompt = """You are a Crisis Management Agent.
     Your goal is to handle the current step of the plan, which involves escalating to a human or handling a sensitive issue.
@@ -26,17 +31,17 @@ def crisis_node(state: DeepAgentState):
     # We should include the last user message to gauge emotion/sentiment if not explicitly in step
     # But usually the planner/orchestrator has passed context.
     
-    messages = [
-        ("system", system_prompt.format(current_step=current_step, scratchpad=scratchpad)),
-    ] + state['messages']
+    # System prompt + running summary + recent turns, within the model's token budget
+    messages = build_context(state, system_prompt.format(current_step=current_step, scratchpad=scratchpad))
     
-    result = llm.invoke(messages)
+    result = await llm.ainvoke(messages)
     
     task_complete = False
     
     if result.tool_calls:
         tool_call = result.tool_calls[0]
-        tool_output = human_handoff_tool.invoke(tool_call['args'])
+        with span("human_handoff_tool", kind="tool", args=sorted(tool_call['args'])):
+            tool_output = await run_tool(human_handoff_tool, tool_call['args'])
         print(f"Tool executed: human_handoff_tool -> {tool_output}")
         response_message = AIMessage(content=str(tool_output))
         task_complete = True
@@ -50,7 +55,4 @@ def crisis_node(state: DeepAgentState):
              # Ideally CrisisAgent SHOULD call the tool.
             task_complete = True
 
-    return {
-        "messages": [response_message],
-        "task_complete": task_complete
-    }
+    return worker_update(state, response_message, task_complete)
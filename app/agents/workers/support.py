@@ -1,22 +1,27 @@
 from langchain_core.tools import tool
 from langchain_core.messages import AIMessage
 from app.state import DeepAgentState
-from app.utils import get_llm
+from app.agents.workers import worker_update
+from app.utils import get_llm, register_chain, get_chain
+from app.context import build_context
 
 
 from app.tools.faq_tool import faq_agent_tool
+from app.tracing import span
+from app.recording import run_tool
 
 # Mock removed, using real tool
 
-def support_node(state: DeepAgentState):
+register_chain("support", lambda: get_llm().bind_tools([faq_agent_tool]))
+
+async def support_node(state: DeepAgentState):
     print("---SUPPORT WORKER---")
     plan = state['plan']
     current_step_index = state['current_step_index']
     scratchpad = state['scratchpad']
     current_step = plan[current_step_index]
     
-    tools = [faq_agent_tool]
-    llm = get_llm().bind_tools(tools)
+    llm = get_chain("support")
     
     system_prompt = """You are a Support Agent. 
     Your goal is to complete the current step of the plan.
@@ -28,11 +33,10 @@ def support_node(state: DeepAgentState):
     {scratchpad}
     """
     
-    messages = [
-        ("system", system_prompt.format(current_step=current_step, scratchpad=scratchpad)),
-    ] + state['messages']
+    # System prompt + running summary + recent turns, within the model's token budget
+    messages = build_context(state, system_prompt.format(current_step=current_step, scratchpad=scratchpad))
     
-    result = llm.invoke(messages)
+    result = await llm.ainvoke(messages)
     
     task_complete = False
     
@@ -42,7 +46,8 @@ def support_node(state: DeepAgentState):
         # faq_agent_tool expects 'user_message'
         # The LLM might generate a different argument name depending on schema.
         # But since we bound it, it should be correct.
-        tool_output = faq_agent_tool.invoke(tool_call['args'])
+        with span("faq_agent_tool", kind="tool", args=sorted(tool_call['args'])):
+            tool_output = await run_tool(faq_agent_tool, tool_call['args'])
         print(f"Tool executed: faq_agent_tool -> {tool_output}")
         response_message = AIMessage(content=str(tool_output))
         task_complete = True
@@ -53,7 +58,4 @@ def support_node(state: DeepAgentState):
         else:
             task_complete = True
 
-    return {
-        "messages": [response_message],
-        "task_complete": task_complete
-    }
+    return worker_update(state, response_message, task_complete)
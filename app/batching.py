@@ -0,0 +1,143 @@
+"""
+app/batching.py
+Cross-request micro-batching for the Planner's small structured-output calls.
+
+Calls arriving within BATCH_WINDOW_MS are collected and dispatched together:
+- a call with nothing else pending or in flight is dispatched at once (there is nothing to batch it with);
+- identical inputs are coalesced into a single LLM call whose result is fanned out to every waiter,
+  including calls that arrive while an identical one is already in flight;
+- the distinct calls of a batch share at most BATCH_MAX_CONCURRENCY in-flight requests per chain,
+  so peaks queue locally instead of tripping provider rate limits.
+
+The chat completions API takes one conversation per request, so a batch is not merged into a
+single HTTP request; it is coalesced and rate-shaped over the shared connection pool instead.
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+from app.config import Config
+from app.recording import record_llm
+from app.utils import get_chain
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Collects calls to one registered chain for a short window and dispatches them as a batch"""
+
+    def __init__(
+        self,
+        chain_name: str,
+        window_ms: float = Config.BATCH_WINDOW_MS,
+        max_batch_size: int = Config.BATCH_MAX_SIZE,
+        max_concurrency: int = Config.BATCH_MAX_CONCURRENCY,
+    ):
+        self.chain_name = chain_name
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.max_concurrency = max_concurrency
+        # Created per event loop on first use (an asyncio.Semaphore binds to one loop)
+        self._slots = None
+        self._slots_loop = None
+        # input key -> (inputs, caller context of the first submitter, waiting futures)
+        self.pending: "OrderedDict[str, Tuple[Dict, contextvars.Context, List[asyncio.Future]]]" = OrderedDict()
+        # input key -> futures waiting on the dispatched call
+        self.in_flight: Dict[str, List[asyncio.Future]] = {}
+        self.timer = None
+        self.counters = {"batches": 0, "calls": 0, "dispatched": 0, "coalesced": 0, "errors": 0}
+
+    async def submit(self, inputs: Dict) -> Any:
+        """Queues a call and waits for its result"""
+        loop = asyncio.get_running_loop()
+        key = json.dumps(inputs, sort_keys=True, default=str)
+        future = loop.create_future()
+        self.counters["calls"] += 1
+        coalesced = key in self.pending or key in self.in_flight
+        if coalesced:
+            waiters = self.pending[key][2] if key in self.pending else self.in_flight[key]
+            waiters.append(future)
+            self.counters["coalesced"] += 1
+        else:
+            # The LLM call runs in the first caller's context (request budget, tracing)
+            self.pending[key] = (inputs, contextvars.copy_context(), [future])
+            if len(self.pending) >= self.max_batch_size or (len(self.pending) == 1 and not self.in_flight):
+                # Full, or alone: waiting out the window would only add latency
+                self.flush()
+            elif self.timer is None:
+                self.timer = loop.call_later(self.window, self.flush)
+        result = await future
+        if coalesced:
+            # Only the first caller's context saw the chain call
+            record_llm(self.chain_name, result)
+        return result
+
+    def flush(self):
+        """Dispatches everything collected so far"""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, OrderedDict()
+        self.counters["batches"] += 1
+        self.counters["dispatched"] += len(batch)
+        for key, (inputs, context, futures) in batch.items():
+            self.in_flight[key] = futures
+            asyncio.get_running_loop().create_task(self._call(key, inputs), context=context)
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots_loop is not loop:
+            self._slots, self._slots_loop = asyncio.Semaphore(self.max_concurrency), loop
+        return self._slots
+
+    async def _call(self, key: str, inputs: Dict):
+        async with self.slots:
+            try:
+                result = await get_chain(self.chain_name).ainvoke(inputs)
+            except Exception as e:
+                self.counters["errors"] += 1
+                for future in self.in_flight.pop(key, []):
+                    if not future.done():
+                        future.set_exception(e)
+                return
+        for future in self.in_flight.pop(key, []):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict:
+        batches = self.counters["batches"]
+        return {
+            **self.counters,
+            "window_ms": self.window * 1000,
+            "max_batch_size": self.max_batch_size,
+            "avg_callers_per_batch": round(self.counters["calls"] / batches, 2) if batches else 0.0,
+            # Distinct calls per batch, relative to the size that triggers an early flush
+            "avg_fill": round(self.counters["dispatched"] / (batches * self.max_batch_size), 3) if batches else 0.0,
+        }
+
+
+_batchers: Dict[str, MicroBatcher] = {}
+
+
+def get_batcher(chain_name: str) -> MicroBatcher:
+    if chain_name not in _batchers:
+        _batchers[chain_name] = MicroBatcher(chain_name)
+    return _batchers[chain_name]
+
+
+async def batched_invoke(chain_name: str, inputs: Dict) -> Any:
+    """ainvoke() on a registered chain, through its micro-batcher when batching is enabled"""
+    if not Config.BATCH_ENABLED:
+        return await get_chain(chain_name).ainvoke(inputs)
+    return await get_batcher(chain_name).submit(inputs)
+
+
+def get_batching_stats() -> Dict:
+    return {name: batcher.stats() for name, batcher in _batchers.items()}
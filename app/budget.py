@@ -0,0 +1,111 @@
+"""
+app/budget.py
+Per-request budget: LLM calls, tokens and wall-clock time.
+
+The API starts a RequestBudget for every /chat turn and binds it to a context variable, which
+LangGraph copies into every node task. A callback on the shared LLM records each call into it.
+Planner and Reviewer snapshot the usage into state, and the Orchestrator stops the run gracefully
+(FINISH with a note on the steps left) before dispatching more work once the budget is exhausted.
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class RequestBudget:
+    """Usage counters and limits for a single request"""
+
+    def __init__(
+        self,
+        max_llm_calls: int = Config.BUDGET_MAX_LLM_CALLS,
+        max_tokens: int = Config.BUDGET_MAX_TOKENS,
+        max_seconds: float = Config.BUDGET_MAX_SECONDS,
+    ):
+        self.max_llm_calls = max_llm_calls
+        self.max_tokens = max_tokens
+        self.max_seconds = max_seconds
+        self.started_at = time.monotonic()
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def record(self, prompt_tokens: int, completion_tokens: int):
+        self.llm_calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def exhausted(self) -> Optional[str]:
+        """Name of the first limit that has been reached, or None"""
+        if self.llm_calls >= self.max_llm_calls:
+            return "llm_calls"
+        if self.prompt_tokens + self.completion_tokens >= self.max_tokens:
+            return "tokens"
+        if self.elapsed >= self.max_seconds:
+            return "wall_clock"
+        return None
+
+    def usage(self) -> Dict:
+        return {
+            "llm_calls": self.llm_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.prompt_tokens + self.completion_tokens,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "exhausted": self.exhausted(),
+        }
+
+
+current_budget: ContextVar[Optional[RequestBudget]] = ContextVar("current_budget", default=None)
+
+
+def start_budget() -> RequestBudget:
+    """Creates the budget for a new request and binds it to the current context"""
+    budget = RequestBudget()
+    current_budget.set(budget)
+    return budget
+
+
+def usage_snapshot() -> Dict:
+    """Usage of the current request for state updates ({} outside a request)"""
+    budget = current_budget.get()
+    return budget.usage() if budget else {}
+
+
+class UsageCallback(BaseCallbackHandler):
+    """Records every LLM call and its token usage into the current request's budget"""
+
+    # Bookkeeping only: run in the caller's context (so the context variable is visible), never in an executor
+    run_inline = True
+
+    def on_llm_end(self, response: LLMResult, **kwargs):
+        budget = current_budget.get()
+        if budget is None:
+            return
+        prompt_tokens = completion_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    prompt_tokens += usage.get("input_tokens", 0)
+                    completion_tokens += usage.get("output_tokens", 0)
+        if not prompt_tokens and not completion_tokens:
+            token_usage = (response.llm_output or {}).get("token_usage") or {}
+            prompt_tokens = token_usage.get("prompt_tokens", 0)
+            completion_tokens = token_usage.get("completion_tokens", 0)
+        budget.record(prompt_tokens, completion_tokens)
+
+
+usage_callback = UsageCallback()
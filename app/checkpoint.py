@@ -0,0 +1,790 @@
+"""
+app/checkpoint.py
+Checkpointer selection and a durable SQLite (WAL) checkpointer for LangGraph.
+"""
+
+import asyncio
+import logging
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import ormsgpack
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+from langgraph.checkpoint.memory import MemorySaver
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    blob BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE INDEX IF NOT EXISTS checkpoints_activity_idx ON checkpoints (thread_id, created_at);
+"""
+
+# Buffered put_writes rows are flushed with the super-step's checkpoint,
+# or earlier if the buffer grows past this many rows.
+MAX_PENDING_WRITES = 500
+
+# Append-only message channels (operator.add) stored as deltas against the previous version
+DELTA_CHANNELS = ("messages",)
+# Blob types written by the message codec
+MESSAGES_SNAPSHOT = "msgpack-messages"
+MESSAGES_DELTA = "msgpack-messages-delta"
+
+
+def _pack_messages(header: Dict[str, Any], messages: List[BaseMessage]) -> Optional[bytes]:
+    """msgpack-encodes plain message dicts (no pickled LangChain objects); None if not encodable"""
+    try:
+        return ormsgpack.packb({**header, "items": [message_to_dict(m) for m in messages]})
+    except (TypeError, ValueError):
+        return None
+
+
+def _delta_base(type_: str, blob: bytes) -> Optional[str]:
+    """Version of the blob a delta was encoded against"""
+    if type_ != MESSAGES_DELTA:
+        return None
+    return ormsgpack.unpackb(blob)["base"]
+
+
+class SQLiteCheckpointer(BaseCheckpointSaver[str]):
+    """
+    File-backed checkpointer (SQLite in WAL mode).
+
+    - Every table is keyed by thread_id first, so per-thread lookups are index seeks.
+    - Task writes are buffered and committed together with the super-step's checkpoint
+      in a single transaction.
+    - Nothing is held in process memory besides SQLite's page cache (bounded by
+      CHECKPOINT_DB_CACHE_KB), so several uvicorn workers can share one database file.
+    """
+
+    def __init__(
+        self,
+        path: str = Config.CHECKPOINT_DB_PATH,
+        cache_size_kb: int = Config.CHECKPOINT_DB_CACHE_KB,
+        *,
+        serde=None,
+        delta_messages: bool = Config.CHECKPOINT_DELTA_MESSAGES,
+    ):
+        super().__init__(serde=serde)
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.lock = threading.Lock()
+        # Appended without the lock (deque appends are atomic), so buffering a write on the
+        # event loop never waits behind a flush, trim or eviction running in a worker thread
+        self._pending_writes: Deque[Tuple] = deque()
+        self.delta_messages = delta_messages
+        # LRU of decoded message lists: (thread_id, ns, channel, version) -> (messages, delta depth).
+        # Versions are never reused, so an entry stays valid whatever other processes write.
+        self._message_lists: "OrderedDict[Tuple[str, str, str, str], Tuple[List[BaseMessage], int]]" = OrderedDict()
+        self._setup(cache_size_kb)
+
+    def _setup(self, cache_size_kb: int):
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("PRAGMA busy_timeout=5000")
+            # Negative cache_size is interpreted by SQLite as KiB
+            self.conn.execute(f"PRAGMA cache_size=-{int(cache_size_kb)}")
+            self.conn.executescript(SCHEMA)
+        logger.info(f"✅ SQLite checkpointer ready at {self.path}")
+
+    def close(self):
+        with self.lock:
+            self._flush_writes()
+            self.conn.close()
+
+    # --- Internal helpers (callers must hold self.lock) ---
+
+    def _flush_writes(self):
+        if not self._pending_writes:
+            return
+        rows = [self._pending_writes.popleft() for _ in range(len(self._pending_writes))]
+        # Special writes (errors, interrupts...) replace; regular task writes are idempotent
+        replace = [row[1:] for row in rows if row[0]]
+        ignore = [row[1:] for row in rows if not row[0]]
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._insert_writes("INSERT OR REPLACE", replace)
+            self._insert_writes("INSERT OR IGNORE", ignore)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def _insert_writes(self, verb: str, rows: List[Tuple]):
+        if rows:
+            self.conn.executemany(
+                f"{verb} INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, blob, task_path) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def _load_blobs(self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> Dict[str, Any]:
+        if not versions:
+            return {}
+        clauses = " OR ".join(["(channel = ? AND version = ?)"] * len(versions))
+        params: List[Any] = [thread_id, checkpoint_ns]
+        for channel, version in versions.items():
+            params.extend([channel, str(version)])
+        rows = self.conn.execute(
+            f"SELECT channel, version, type, blob FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND ({clauses})",
+            params,
+        ).fetchall()
+        values = {}
+        for channel, version, type_, blob in rows:
+            if type_ == "empty":
+                continue
+            if type_ in (MESSAGES_SNAPSHOT, MESSAGES_DELTA):
+                values[channel] = list(self._decode_messages(thread_id, checkpoint_ns, channel, version, type_, blob)[0])
+            else:
+                values[channel] = self.serde.loads_typed((type_, blob))
+        return values
+
+    # --- Message delta codec ---
+
+    def _cache_messages(self, key: Tuple[str, str, str, str], messages: List[BaseMessage], depth: int):
+        self._message_lists[key] = (messages, depth)
+        self._message_lists.move_to_end(key)
+        while len(self._message_lists) > Config.CHECKPOINT_DELTA_CACHE_SIZE:
+            self._message_lists.popitem(last=False)
+
+    def _decode_messages(self, thread_id: str, checkpoint_ns: str, channel: str, version: str,
+                         type_: str, blob: bytes) -> Tuple[List[BaseMessage], int]:
+        """Rebuilds a message list on read, walking delta bases only as far as the LRU requires"""
+        key = (thread_id, checkpoint_ns, channel, version)
+        if key in self._message_lists:
+            self._message_lists.move_to_end(key)
+            return self._message_lists[key]
+
+        # Collect payloads newest -> oldest until a snapshot or a cached base is reached
+        payloads = [ormsgpack.unpackb(blob)]
+        base: List[BaseMessage] = []
+        while type_ == MESSAGES_DELTA:
+            base_key = (thread_id, checkpoint_ns, channel, payloads[-1]["base"])
+            if base_key in self._message_lists:
+                base = self._message_lists[base_key][0]
+                break
+            row = self.conn.execute(
+                "SELECT type, blob FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                base_key,
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Missing delta base {base_key[3]} for {channel} in thread {thread_id}")
+            type_ = row[0]
+            payloads.append(ormsgpack.unpackb(row[1]))
+
+        items = [item for payload in reversed(payloads) for item in payload["items"]]
+        result = (base + messages_from_dict(items), payloads[0].get("depth", 0))
+        self._cache_messages(key, *result)
+        return result
+
+    def _message_base(self, thread_id: str, checkpoint_ns: str, channel: str,
+                      parent_id: Optional[str]) -> Optional[Tuple[str, Tuple[List[BaseMessage], int]]]:
+        """
+        The parent checkpoint's version of a message channel and its (messages, depth), if its blob
+        is still stored. Call inside the write transaction: the base can't be deleted before the commit.
+        """
+        if parent_id is None:
+            return None
+        row = self.conn.execute(
+            "SELECT type, checkpoint FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, checkpoint_ns, parent_id),
+        ).fetchone()
+        if row is None:
+            return None
+        version = self.serde.loads_typed(row)["channel_versions"].get(channel)
+        if version is None:
+            return None
+        key = (thread_id, checkpoint_ns, channel, str(version))
+        # Another process's trim or eviction may have deleted it since it was cached
+        row = self.conn.execute(
+            "SELECT type, blob FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?", key
+        ).fetchone()
+        if row is None or row[0] not in (MESSAGES_SNAPSHOT, MESSAGES_DELTA):
+            return None
+        try:
+            return key[3], self._decode_messages(*key, *row)
+        except ValueError:
+            return None
+
+    def _encode_messages(self, thread_id: str, checkpoint_ns: str, channel: str, version: str,
+                         messages: List[BaseMessage], parent_id: Optional[str]) -> Optional[Tuple[str, bytes]]:
+        """
+        Encodes only the messages appended since the parent checkpoint's version, or a full snapshot
+        (periodically, or when that version is gone). Call inside the write transaction.
+        """
+        if not all(isinstance(m, BaseMessage) for m in messages):
+            return None
+
+        base_version, base = self._message_base(thread_id, checkpoint_ns, channel, parent_id) or (None, None)
+        encoded = None
+        depth = 0
+        if base is not None:
+            base_messages, base_depth = base
+            is_prefix = len(base_messages) <= len(messages) and all(
+                a is b or a == b for a, b in zip(base_messages, messages)
+            )
+            if is_prefix and base_depth < Config.CHECKPOINT_SNAPSHOT_INTERVAL:
+                depth = base_depth + 1
+                packed = _pack_messages({"base": base_version, "depth": depth}, messages[len(base_messages):])
+                encoded = (MESSAGES_DELTA, packed) if packed is not None else None
+        if encoded is None:
+            depth = 0
+            packed = _pack_messages({"depth": 0}, messages)
+            if packed is None:
+                return None
+            encoded = (MESSAGES_SNAPSHOT, packed)
+
+        self._cache_messages((thread_id, checkpoint_ns, channel, version), list(messages), depth)
+        return encoded
+
+    def _load_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> List[Tuple[str, str, Any]]:
+        rows = self.conn.execute(
+            "SELECT task_id, idx, channel, type, blob, task_path FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        rows.sort(key=lambda r: writes_sort_key(r[5], r[0], r[1]))
+        return [(task_id, channel, self.serde.loads_typed((type_, blob))) for task_id, _, channel, type_, blob, _ in rows]
+
+    def _row_to_tuple(self, thread_id: str, checkpoint_ns: str, row: Tuple) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, type_, checkpoint_blob, metadata_type, metadata_blob = row
+        checkpoint: Checkpoint = self.serde.loads_typed((type_, checkpoint_blob))
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._load_blobs(thread_id, checkpoint_ns, checkpoint["channel_versions"]),
+            },
+            metadata=self.serde.loads_typed((metadata_type, metadata_blob)),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=self._load_writes(thread_id, checkpoint_ns, checkpoint_id),
+        )
+
+    # --- Sync API ---
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+        with self.lock:
+            self._flush_writes()
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self.conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self.conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            if row is None:
+                return None
+            return self._row_to_tuple(thread_id, checkpoint_ns, row)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+            "metadata_type, metadata FROM checkpoints"
+        )
+        where, params = [], []
+        if config:
+            where.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                where.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                where.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            where.append("checkpoint_id < ?")
+            params.append(before_id)
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY checkpoint_id DESC"
+        # Metadata filters are applied after deserialization, so only push LIMIT down without them
+        if limit is not None and not filter:
+            query += f" LIMIT {int(limit)}"
+
+        with self.lock:
+            self._flush_writes()
+            rows = self.conn.execute(query, params).fetchall()
+
+        for thread_id, checkpoint_ns, *row in rows:
+            if limit is not None and limit <= 0:
+                break
+            with self.lock:
+                result = self._row_to_tuple(thread_id, checkpoint_ns, tuple(row))
+            if filter and not all(result.metadata.get(k) == v for k, v in filter.items()):
+                continue
+            if limit is not None:
+                limit -= 1
+            yield result
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        c = checkpoint.copy()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        values: Dict[str, Any] = c.pop("channel_values")
+
+        type_, checkpoint_blob = self.serde.dumps_typed(c)
+        metadata_type, metadata_blob = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+
+        blob_rows, message_channels = [], []
+        for channel, version in new_versions.items():
+            if channel not in values:
+                blob_rows.append((thread_id, checkpoint_ns, channel, str(version), "empty", None))
+            elif self.delta_messages and channel in DELTA_CHANNELS and isinstance(values[channel], list):
+                message_channels.append((channel, str(version)))
+            else:
+                blob_rows.append((thread_id, checkpoint_ns, channel, str(version), *self.serde.dumps_typed(values[channel])))
+        parent_id = config["configurable"].get("checkpoint_id")
+
+        with self.lock:
+            self._flush_writes()
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Message channels are encoded here, so a delta's base is known to exist when it commits
+                for channel, version in message_channels:
+                    encoded = self._encode_messages(thread_id, checkpoint_ns, channel, version, values[channel], parent_id)
+                    blob_type, blob = encoded or self.serde.dumps_typed(values[channel])
+                    blob_rows.append((thread_id, checkpoint_ns, channel, version, blob_type, blob))
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO blobs (thread_id, checkpoint_ns, channel, version, type, blob) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    blob_rows,
+                )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+                    "type, checkpoint, metadata_type, metadata, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        thread_id,
+                        checkpoint_ns,
+                        checkpoint["id"],
+                        parent_id,
+                        type_,
+                        checkpoint_blob,
+                        metadata_type,
+                        metadata_blob,
+                        time.time(),
+                    ),
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        if self._buffer_writes(config, writes, task_id, task_path) >= MAX_PENDING_WRITES:
+            self._flush_pending()
+
+    def _buffer_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str) -> int:
+        """Serializes task writes into the pending buffer (no lock needed); returns the buffer's length"""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            type_, blob = self.serde.dumps_typed(value)
+            rows.append((
+                write_idx < 0,
+                thread_id, checkpoint_ns, checkpoint_id, task_id, write_idx, channel, type_, blob, task_path,
+            ))
+        self._pending_writes.extend(rows)
+        return len(self._pending_writes)
+
+    def _flush_pending(self):
+        with self.lock:
+            self._flush_writes()
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self.lock:
+            self._forget_messages(lambda key: key[0] == thread_id)
+            self._flush_writes()
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for table in ("checkpoints", "blobs", "writes"):
+                    self.conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def _forget_messages(self, predicate):
+        for key in [k for k in self._message_lists if predicate(k)]:
+            del self._message_lists[key]
+
+    def trim(self, keep_last: int) -> int:
+        """Keeps only the latest `keep_last` checkpoints per thread. Returns bytes freed."""
+        keep_last = max(1, keep_last)
+        freed = 0
+        with self.lock:
+            self._flush_writes()
+            candidates = self.conn.execute(
+                "SELECT thread_id, checkpoint_ns FROM checkpoints GROUP BY thread_id, checkpoint_ns HAVING COUNT(*) > ?",
+                (keep_last,),
+            ).fetchall()
+        # The lock is taken per thread, so puts and reads of other threads interleave with the pass
+        for thread_id, checkpoint_ns in candidates:
+            with self.lock:
+                self._flush_writes()
+                self.conn.execute("BEGIN IMMEDIATE")
+                try:
+                    freed += self._trim_namespace(thread_id, checkpoint_ns, keep_last)
+                    self.conn.execute("COMMIT")
+                except Exception:
+                    self.conn.execute("ROLLBACK")
+                    raise
+        return freed
+
+    def _trim_namespace(self, thread_id: str, checkpoint_ns: str, keep_last: int) -> int:
+        key = (thread_id, checkpoint_ns)
+        kept = self.conn.execute(
+            "SELECT checkpoint_id, type, checkpoint FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT ?",
+            (*key, keep_last),
+        ).fetchall()
+        # Deleted since the candidates were selected
+        if not kept:
+            return 0
+        oldest_kept = kept[-1][0]
+
+        freed = self.conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) FROM checkpoints "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+            (*key, oldest_kept),
+        ).fetchone()[0]
+        freed += self.conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(blob)), 0) FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+            (*key, oldest_kept),
+        ).fetchone()[0]
+        self.conn.execute(
+            "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?", (*key, oldest_kept)
+        )
+        self.conn.execute(
+            "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?", (*key, oldest_kept)
+        )
+
+        # Drop channel blobs no surviving checkpoint points at
+        referenced = set()
+        for _, type_, checkpoint_blob in kept:
+            versions = self.serde.loads_typed((type_, checkpoint_blob))["channel_versions"]
+            referenced.update((channel, str(version)) for channel, version in versions.items())
+        # Message deltas keep their whole base chain alive
+        blob_types = {
+            (channel, version): type_
+            for channel, version, type_ in self.conn.execute(
+                "SELECT channel, version, type FROM blobs WHERE thread_id = ? AND checkpoint_ns = ?", key
+            ).fetchall()
+        }
+        frontier = [ref for ref in referenced if blob_types.get(ref) == MESSAGES_DELTA]
+        while frontier:
+            channel, version = frontier.pop()
+            blob = self.conn.execute(
+                "SELECT blob FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                (*key, channel, version),
+            ).fetchone()[0]
+            base = (channel, _delta_base(MESSAGES_DELTA, blob))
+            if base not in referenced:
+                referenced.add(base)
+                if blob_types.get(base) == MESSAGES_DELTA:
+                    frontier.append(base)
+        stale = [
+            (channel, version, size)
+            for channel, version, size in self.conn.execute(
+                "SELECT channel, version, COALESCE(LENGTH(blob), 0) FROM blobs WHERE thread_id = ? AND checkpoint_ns = ?", key
+            ).fetchall()
+            if (channel, version) not in referenced
+        ]
+        stale_keys = {(thread_id, checkpoint_ns, channel, version) for channel, version, _ in stale}
+        self._forget_messages(lambda k: k in stale_keys)
+        self.conn.executemany(
+            "DELETE FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+            [(*key, channel, version) for channel, version, _ in stale],
+        )
+        return freed + sum(size for _, _, size in stale)
+
+    def evict_idle(self, ttl: int, now: Optional[float] = None) -> Tuple[int, int]:
+        """Deletes threads with no checkpoint newer than `ttl` seconds. Returns (threads, bytes freed)."""
+        cutoff = (now if now is not None else time.time()) - ttl
+        with self.lock:
+            self._flush_writes()
+            candidates = [
+                row[0] for row in self.conn.execute(
+                    "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(created_at) < ?", (cutoff,)
+                ).fetchall()
+            ]
+        evicted, freed = 0, 0
+        # One locked transaction per thread, so other threads' turns interleave with the pass
+        for thread_id in candidates:
+            with self.lock:
+                self._flush_writes()
+                self.conn.execute("BEGIN IMMEDIATE")
+                try:
+                    # Re-checked in the transaction: a turn may have resumed the thread since the selection
+                    idle = self.conn.execute(
+                        "SELECT MAX(created_at) < ? FROM checkpoints WHERE thread_id = ?", (cutoff, thread_id)
+                    ).fetchone()[0]
+                    if idle:
+                        freed += self.conn.execute(
+                            "SELECT (SELECT COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) FROM checkpoints WHERE thread_id = ?)"
+                            " + (SELECT COALESCE(SUM(LENGTH(blob)), 0) FROM blobs WHERE thread_id = ?)"
+                            " + (SELECT COALESCE(SUM(LENGTH(blob)), 0) FROM writes WHERE thread_id = ?)",
+                            (thread_id, thread_id, thread_id),
+                        ).fetchone()[0]
+                        for table in ("blobs", "writes", "checkpoints"):
+                            self.conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+                    self.conn.execute("COMMIT")
+                except Exception:
+                    self.conn.execute("ROLLBACK")
+                    raise
+                if idle:
+                    evicted += 1
+                    self._forget_messages(lambda key: key[0] == thread_id)
+        return evicted, freed
+
+    async def amaintain(self, keep_last: int, idle_ttl: int) -> Dict[str, int]:
+        return await asyncio.to_thread(_maintain, self, keep_last, idle_ttl)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # --- Async API (SQLite calls run in a worker thread, like the calendar manager) ---
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ):
+        results = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in results:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        # Buffering takes no lock, so it stays on the loop; only a flush (which does) hops to a thread
+        if self._buffer_writes(config, writes, task_id, task_path) >= MAX_PENDING_WRITES:
+            await asyncio.to_thread(self._flush_pending)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+class RetainingMemorySaver(MemorySaver):
+    """In-process MemorySaver that supports the same retention / eviction passes as SQLiteCheckpointer"""
+
+    def __init__(self, *, serde=None):
+        super().__init__(serde=serde)
+        # thread_id -> wall-clock time of the last checkpoint
+        self.last_activity: Dict[str, float] = {}
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        self.last_activity[config["configurable"]["thread_id"]] = time.time()
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def trim(self, keep_last: int) -> int:
+        """Keeps only the latest `keep_last` checkpoints per thread. Returns bytes freed."""
+        keep_last = max(1, keep_last)
+        freed = 0
+        for thread_id, namespaces in self.storage.items():
+            for checkpoint_ns, checkpoints in namespaces.items():
+                if len(checkpoints) <= keep_last:
+                    continue
+                ordered = sorted(checkpoints, reverse=True)
+                for checkpoint_id in ordered[keep_last:]:
+                    checkpoint, metadata, _ = checkpoints.pop(checkpoint_id)
+                    freed += len(checkpoint[1]) + len(metadata[1])
+                    for write in self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), {}).values():
+                        freed += len(write[2][1])
+
+                referenced = set()
+                for checkpoint, _, _ in checkpoints.values():
+                    versions = self.serde.loads_typed(checkpoint)["channel_versions"]
+                    referenced.update((thread_id, checkpoint_ns, channel, version) for channel, version in versions.items())
+                for key in [k for k in self.blobs if k[:2] == (thread_id, checkpoint_ns) and k not in referenced]:
+                    freed += len(self.blobs.pop(key)[1])
+        return freed
+
+    def evict_idle(self, ttl: int, now: Optional[float] = None) -> Tuple[int, int]:
+        """Deletes threads with no checkpoint newer than `ttl` seconds. Returns (threads, bytes freed)."""
+        cutoff = (now if now is not None else time.time()) - ttl
+        idle = [thread_id for thread_id, last in self.last_activity.items() if last < cutoff]
+        freed = 0
+        for thread_id in idle:
+            for checkpoints in self.storage.get(thread_id, {}).values():
+                freed += sum(len(c[1]) + len(m[1]) for c, m, _ in checkpoints.values())
+            freed += sum(
+                len(write[2][1])
+                for key, writes in self.writes.items() if key[0] == thread_id
+                for write in writes.values()
+            )
+            freed += sum(len(blob[1]) for key, blob in self.blobs.items() if key[0] == thread_id)
+            self.delete_thread(thread_id)
+            self.last_activity.pop(thread_id, None)
+        return len(idle), freed
+
+    async def amaintain(self, keep_last: int, idle_ttl: int) -> Dict[str, int]:
+        # Runs on the event loop, so it never interleaves with the saver's own (sync) updates
+        return _maintain(self, keep_last, idle_ttl)
+
+
+def _maintain(checkpointer, keep_last: int, idle_ttl: int) -> Dict[str, int]:
+    threads_evicted, evicted_bytes = checkpointer.evict_idle(idle_ttl)
+    trimmed_bytes = checkpointer.trim(keep_last)
+    return {
+        "threads_evicted": threads_evicted,
+        "bytes_freed": evicted_bytes + trimmed_bytes,
+    }
+
+
+async def run_checkpoint_maintenance(
+    checkpointer,
+    interval: int = Config.BUFFER_CLEANUP_INTERVAL,
+    idle_ttl: int = Config.BUFFER_TTL,
+    keep_last: int = Config.CHECKPOINT_RETENTION,
+):
+    """Background loop: evict idle threads and trim old checkpoints every `interval` seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            stats = await checkpointer.amaintain(keep_last, idle_ttl)
+            logger.info(
+                f"🧹 Checkpoint maintenance: evicted {stats['threads_evicted']} idle thread(s), "
+                f"freed {stats['bytes_freed']} bytes"
+            )
+        except Exception as e:
+            logger.error(f"❌ Checkpoint maintenance failed: {e}")
+
+
+def create_checkpointer():
+    """Builds the checkpointer selected by Config.CHECKPOINTER ("memory" or "sqlite")"""
+    backend = Config.CHECKPOINTER.lower()
+    if backend == "sqlite":
+        return SQLiteCheckpointer()
+    if backend != "memory":
+        logger.warning(f"⚠️ Unknown CHECKPOINTER '{Config.CHECKPOINTER}', falling back to in-memory")
+    return RetainingMemorySaver()
@@ -25,14 +25,98 @@ class Config:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
     PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME", "agent-memory")
+    PINECONE_POOL_SIZE = int(os.getenv("PINECONE_POOL_SIZE", 32))  # pooled connections, sized for MAX_CONCURRENT_REQUESTS
+    PINECONE_TIMEOUT = float(os.getenv("PINECONE_TIMEOUT", 10))  # seconds per call
     
     # App Settings
     APP_TITLE = os.getenv("APP_TITLE", "DeepAgent AI Chat Assistant")
     
+    # LLM Settings
+    LLM_MODEL = os.getenv("LLM_MODEL", "openai/gpt-oss-120b")
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 60))  # seconds
+    LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", 100))
+    LLM_POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", 20))
+    LLM_POOL_KEEPALIVE_EXPIRY = float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", 30))  # seconds
+    
+    # Context Settings
+    DEFAULT_TOKEN_BUDGET = int(os.getenv("DEFAULT_TOKEN_BUDGET", 8000))  # prompt tokens per worker call
+    MODEL_TOKEN_BUDGETS = {
+        "openai/gpt-oss-120b": int(os.getenv("GPT_OSS_TOKEN_BUDGET", 16000)),
+    }
+    CONTEXT_RECENT_TURNS = int(os.getenv("CONTEXT_RECENT_TURNS", 4))  # turns kept verbatim, older ones are summarized
+    TOKEN_COUNT_CACHE_SIZE = int(os.getenv("TOKEN_COUNT_CACHE_SIZE", 4096))
+    SUMMARY_PENDING_MAX = int(os.getenv("SUMMARY_PENDING_MAX", 1024))  # background summary updates waiting for their thread's next turn
+    
+    # Budget Settings (per /chat request)
+    BUDGET_MAX_LLM_CALLS = int(os.getenv("BUDGET_MAX_LLM_CALLS", 20))
+    BUDGET_MAX_TOKENS = int(os.getenv("BUDGET_MAX_TOKENS", 100000))  # prompt + completion
+    BUDGET_MAX_SECONDS = float(os.getenv("BUDGET_MAX_SECONDS", 90))
+    MAX_STEP_RETRIES = int(os.getenv("MAX_STEP_RETRIES", 2))  # Reviewer retries before a step is skipped
+    
     # Cache Settings
-    EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", 1000))
     STATS_CACHE_TTL = int(os.getenv("STATS_CACHE_TTL", 60))  # seconds
-    SYSTEM_MESSAGE_CACHE_SIZE = int(os.getenv("SYSTEM_MESSAGE_CACHE_SIZE", 100))
+    SYSTEM_MESSAGE_CACHE_SIZE = int(os.getenv("SYSTEM_MESSAGE_CACHE_SIZE", 100))  # LLM responses kept by the LLM cache
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", 3600))  # seconds
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "")  # SQLite file; empty keeps the cache in memory only
+    LLM_SEMANTIC_CACHE = os.getenv("LLM_SEMANTIC_CACHE", "true").lower() == "true"  # near-duplicate hits, calls without tools only
+    LLM_SEMANTIC_CACHE_THRESHOLD = float(os.getenv("LLM_SEMANTIC_CACHE_THRESHOLD", 0.95))  # min cosine for a near-duplicate hit
+    PLAN_CACHE_ENABLED = os.getenv("PLAN_CACHE_ENABLED", "true").lower() == "true"
+    PLAN_CACHE_SIZE = int(os.getenv("PLAN_CACHE_SIZE", 256))
+    PLAN_CACHE_TTL = int(os.getenv("PLAN_CACHE_TTL", 3600))  # seconds
+    
+    # Checkpointer Settings
+    CHECKPOINTER = os.getenv("CHECKPOINTER", "memory")  # "memory" or "sqlite"
+    CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "checkpoints.db")
+    CHECKPOINT_DB_CACHE_KB = int(os.getenv("CHECKPOINT_DB_CACHE_KB", 16384))  # SQLite page cache per process
+    CHECKPOINT_RETENTION = int(os.getenv("CHECKPOINT_RETENTION", 5))  # checkpoints kept per thread
+    CHECKPOINT_DELTA_MESSAGES = os.getenv("CHECKPOINT_DELTA_MESSAGES", "true").lower() == "true"
+    CHECKPOINT_SNAPSHOT_INTERVAL = int(os.getenv("CHECKPOINT_SNAPSHOT_INTERVAL", 50))  # deltas between full snapshots
+    CHECKPOINT_DELTA_CACHE_SIZE = int(os.getenv("CHECKPOINT_DELTA_CACHE_SIZE", 256))  # decoded message lists kept in RAM
+    
+    # Micro-batching Settings (Planner structured calls)
+    BATCH_ENABLED = os.getenv("BATCH_ENABLED", "true").lower() == "true"
+    BATCH_WINDOW_MS = float(os.getenv("BATCH_WINDOW_MS", 15))  # collection window
+    BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", 16))  # distinct calls that trigger an early flush
+    BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", os.getenv("MAX_CONCURRENT_REQUESTS", 32)))  # in-flight calls per chain; defaults to the admission limit
+    
+    # Prefetch Settings
+    PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "true").lower() == "true"  # calendar / FAQ lookups right after planning
+    
+    # Admission Settings
+    MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", 32))  # graph runs executing at once
+    MAX_QUEUED_REQUESTS = int(os.getenv("MAX_QUEUED_REQUESTS", 64))  # waiting beyond that, then 429
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 30))  # seconds a request may wait
+    ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", 5))  # Retry-After header, seconds
+    
+    # Tracing Settings
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")  # one span per line
+    TRACE_MAX_BYTES = int(os.getenv("TRACE_MAX_BYTES", 10 * 1024 * 1024))  # rotate after 10 MB
+    TRACE_BACKUP_COUNT = int(os.getenv("TRACE_BACKUP_COUNT", 5))  # rotated files kept
+    
+    # Startup Settings
+    WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"  # load FAQ / calendar / Pinecone in the background at startup
+    SUBSYSTEM_RETRY_SECONDS = float(os.getenv("SUBSYSTEM_RETRY_SECONDS", 60))  # before retrying a failed subsystem
+    
+    # Memory Settings
+    MEMORY_BACKEND = os.getenv("MEMORY_BACKEND", "pinecone")  # "pinecone" or "local" (MiniLM + on-disk shards, no network)
+    MEMORY_LOCAL_DIR = os.getenv("MEMORY_LOCAL_DIR", "memory_shards")  # local backend: one shard directory per user
+    MEMORY_LOCAL_SHARDS_CACHED = int(os.getenv("MEMORY_LOCAL_SHARDS_CACHED", 1024))  # user shards kept open (mmap)
+    
+    # Memory Write-behind Settings
+    MEMORY_WRITE_BEHIND = os.getenv("MEMORY_WRITE_BEHIND", "true").lower() == "true"  # /chat enqueues memories instead of awaiting the upsert
+    MEMORY_QUEUE_SIZE = int(os.getenv("MEMORY_QUEUE_SIZE", 10000))  # queued records; new ones are dropped beyond that
+    MEMORY_BATCH_SIZE = int(os.getenv("MEMORY_BATCH_SIZE", 64))  # records per upsert (Pinecone takes at most 96)
+    MEMORY_FLUSH_INTERVAL_MS = float(os.getenv("MEMORY_FLUSH_INTERVAL_MS", 500))  # max wait for a batch to fill
+    MEMORY_RETRY_BASE_SECONDS = float(os.getenv("MEMORY_RETRY_BASE_SECONDS", 0.5))  # first backoff after a failed flush
+    MEMORY_RETRY_MAX_SECONDS = float(os.getenv("MEMORY_RETRY_MAX_SECONDS", 30))  # backoff cap
+    MEMORY_DRAIN_SECONDS = float(os.getenv("MEMORY_DRAIN_SECONDS", 5))  # last flush attempt at shutdown
+    MEMORY_QUEUE_FILE = os.getenv("MEMORY_QUEUE_FILE", "memory_queue.jsonl")  # unwritten records kept across restarts
+    
+    # Recording Settings (sessions for python -m benchmarks.replay)
+    RECORDING_ENABLED = os.getenv("RECORDING_ENABLED", "false").lower() == "true"
+    RECORDING_DIR = os.getenv("RECORDING_DIR", "recordings")  # one JSONL file per thread
     
     # Cleanup Settings
     STREAM_CLEANUP_INTERVAL = int(os.getenv("STREAM_CLEANUP_INTERVAL", 300))  # 5 minutes
@@ -0,0 +1,184 @@
+"""
+app/context.py
+Token-budgeted context assembly for worker prompts.
+
+Workers see: system prompt + running summary of older turns + the last K turns verbatim,
+trimmed (oldest turn first) to the model's token budget.
+The summary is folded forward incrementally, in the background: the Planner starts the update
+and the next turn of the same thread picks up the result. Messages the summary doesn't cover
+yet stay in the verbatim window, so a slow or failed update never drops them from context.
+"""
+
+import asyncio
+import contextvars
+import logging
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage
+from langchain_core.prompts import ChatPromptTemplate
+
+from app.config import Config
+from app.utils import get_llm, register_chain, get_chain
+
+logger = logging.getLogger(__name__)
+
+_encoding = None
+_encoding_failed = False
+
+
+def _get_encoding():
+    """tiktoken encoder, loaded once; None if unavailable (e.g. offline without a cached BPE file)"""
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            logger.warning(f"⚠️ tiktoken unavailable, estimating tokens from length: {e}")
+            _encoding_failed = True
+    return _encoding
+
+
+@lru_cache(maxsize=Config.TOKEN_COUNT_CACHE_SIZE)
+def _count_text_tokens(role: str, text: str) -> int:
+    encoding = _get_encoding()
+    # ~4 tokens of per-message framing (role, separators)
+    if encoding is None:
+        return len(text) // 4 + 4
+    return len(encoding.encode(text)) + 4
+
+
+def count_tokens(message) -> int:
+    """Token count for a message or a (role, content) tuple, cached by content"""
+    if isinstance(message, tuple):
+        role, content = message
+    else:
+        role, content = message.type, message.content
+    return _count_text_tokens(role, content if isinstance(content, str) else str(content))
+
+
+def get_token_budget(model: str = Config.LLM_MODEL) -> int:
+    return Config.MODEL_TOKEN_BUDGETS.get(model, Config.DEFAULT_TOKEN_BUDGET)
+
+
+def split_turns(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+    """Groups messages into turns, each starting at a HumanMessage"""
+    turns: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def recent_window_start(messages: List[BaseMessage], recent_turns: int = Config.CONTEXT_RECENT_TURNS) -> int:
+    """Index of the first message kept verbatim; everything before it belongs in the summary"""
+    turns = split_turns(messages)
+    older = turns[:-recent_turns] if recent_turns > 0 else turns
+    return sum(len(turn) for turn in older)
+
+
+def build_context(state: Dict, system_prompt: str, model: str = Config.LLM_MODEL) -> List:
+    """Messages for a worker LLM call that fit the model's token budget"""
+    messages = state['messages']
+    budget = get_token_budget(model)
+
+    system_messages = [("system", system_prompt)]
+    summary = state.get('conversation_summary')
+    if summary:
+        system_messages.append(("system", f"Summary of the earlier conversation:\n{summary}"))
+    used = sum(count_tokens(m) for m in system_messages)
+
+    # Newest turns first, stop when the next (older) turn would not fit; nothing the summary
+    # doesn't cover yet is left out of the window
+    summarized = state.get('summarized_message_count') or 0
+    window = messages[min(recent_window_start(messages), summarized):]
+    kept_turns: List[List[BaseMessage]] = []
+    for turn in reversed(split_turns(window)):
+        turn_tokens = sum(count_tokens(m) for m in turn)
+        if kept_turns and used + turn_tokens > budget:
+            break
+        kept_turns.append(turn)
+        used += turn_tokens
+
+    return system_messages + [m for turn in reversed(kept_turns) for m in turn]
+
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and a B2B assistant.
+    Update the summary with the new messages. Keep names, emails, companies, dates, bookings and open issues.
+    Reply with the updated summary only.
+
+    Current summary:
+    {summary}"""
+
+
+def build_summary_chain():
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", SUMMARY_PROMPT),
+        ("user", "{transcript}"),
+    ])
+    return prompt | get_llm()
+
+
+register_chain("summary", build_summary_chain)
+
+
+async def update_summary(state: Dict) -> Optional[Dict]:
+    """
+    Folds messages that left the verbatim window into the running summary.
+    Only the newly evicted messages are sent to the LLM. Returns a state update, or None.
+    """
+    messages = state['messages']
+    summarized = state.get('summarized_message_count') or 0
+    window_start = recent_window_start(messages)
+    if window_start <= summarized:
+        return None
+
+    evicted = messages[summarized:window_start]
+    transcript = "\n".join(f"{m.type}: {m.content}" for m in evicted)
+    result = await get_chain("summary").ainvoke({
+        "summary": state.get('conversation_summary') or "(empty)",
+        "transcript": transcript,
+    })
+    return {"conversation_summary": result.content, "summarized_message_count": window_start}
+
+
+# thread_id -> (summarized_message_count the update started from, its task), oldest first
+_pending_summaries: Dict[str, Tuple[int, asyncio.Task]] = {}
+
+
+def _log_summary_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Summary update failed: {task.exception()}")
+
+
+def start_summary_update(thread_id: str, state: Dict):
+    """
+    Runs update_summary in the background; its result is applied on the thread's next turn.
+    The task runs outside the request's context, so it is neither billed to nor recorded with the turn.
+    """
+    if thread_id in _pending_summaries:
+        return
+    task = asyncio.create_task(update_summary(state), context=contextvars.Context())
+    task.add_done_callback(_log_summary_failure)
+    _pending_summaries[thread_id] = (state.get('summarized_message_count') or 0, task)
+    while len(_pending_summaries) > Config.SUMMARY_PENDING_MAX:
+        # Threads that never came back: their update is dropped and redone if they do
+        _, oldest = _pending_summaries.pop(next(iter(_pending_summaries)))
+        oldest.cancel()
+
+
+def collect_summary_update(thread_id: str, state: Dict) -> Dict:
+    """The state update of the thread's finished background summary, or {} if none applies"""
+    pending = _pending_summaries.get(thread_id)
+    if pending is None or not pending[1].done():
+        return {}
+    del _pending_summaries[thread_id]
+    started_from, task = pending
+    if task.cancelled() or task.exception() is not None:
+        return {}
+    # Only on top of the summary it extended (another worker process may have moved the thread on)
+    if started_from != (state.get('summarized_message_count') or 0):
+        return {}
+    return task.result() or {}
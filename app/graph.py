@@ -1,4 +1,5 @@
 from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
 from app.state import DeepAgentState
 from app.agents.planner import planner_node
 from app.agents.orchestrator import orchestrator_node 
@@ -6,18 +7,21 @@ from app.agents.workers.booking import booking_node
 from app.agents.workers.support import support_node
 from app.agents.workers.crisis import crisis_node
 from app.agents.reviewer import reviewer_node, reviewer_conditional
-from langgraph.checkpoint.memory import MemorySaver
+from app.agents.workers import WORKER_NAMES
+from app.checkpoint import create_checkpointer
+from app.metrics import instrument_node
 
 def create_graph():
     builder = StateGraph(DeepAgentState)
     
     # Add Nodes
-    builder.add_node("Planner", planner_node)
-    builder.add_node("Orchestrator", orchestrator_node)
-    builder.add_node("BookingAgent", booking_node)
-    builder.add_node("SupportAgent", support_node)
-    builder.add_node("CrisisAgent", crisis_node) 
-    builder.add_node("Reviewer", reviewer_node)
+    # (each wrapped so its execution time lands in the node latency histogram)
+    builder.add_node("Planner", instrument_node("Planner", planner_node))
+    builder.add_node("Orchestrator", instrument_node("Orchestrator", orchestrator_node))
+    builder.add_node("BookingAgent", instrument_node("BookingAgent", booking_node))
+    builder.add_node("SupportAgent", instrument_node("SupportAgent", support_node))
+    builder.add_node("CrisisAgent", instrument_node("CrisisAgent", crisis_node))
+    builder.add_node("Reviewer", instrument_node("Reviewer", reviewer_node))
       
     # Edges
     # START -> Planner
@@ -41,13 +45,19 @@ def create_graph():
         worker_name = state.get("next_worker")
         if worker_name == "FINISH":
             return END
+        if worker_name == "PARALLEL":
+            # Fan out independent steps; each branch sees its own step as current.
+            # Branch writes are applied in Send order, so the merge before the Reviewer is deterministic.
+            return [
+                Send(state["step_workers"][index], {**state, "current_step_index": index})
+                for index in state["active_steps"]
+            ]
         return worker_name
         
-    builder.add_conditional_edges("Orchestrator", orchestrator_routing, ["BookingAgent", "SupportAgent", "CrisisAgent", END])
+    builder.add_conditional_edges("Orchestrator", orchestrator_routing, [*WORKER_NAMES, END])
     
-    builder.add_edge("BookingAgent", "Reviewer")
-    builder.add_edge("SupportAgent", "Reviewer")
-    builder.add_edge("CrisisAgent", "Reviewer")
+    for worker_name in WORKER_NAMES:
+        builder.add_edge(worker_name, "Reviewer")
     
     # Reviewer Conditional
     builder.add_conditional_edges("Reviewer", reviewer_conditional, {
@@ -56,6 +66,7 @@ def create_graph():
     })
     
     # Compile
-    memory = MemorySaver()
+    # MemorySaver by default, SQLite (WAL) when Config.CHECKPOINTER == "sqlite"
+    memory = create_checkpointer()
     graph = builder.compile(checkpointer=memory)
     return graph
@@ -0,0 +1,270 @@
+"""
+app/llm_cache.py
+Two-tier response cache for the shared LLM client (plugged in as a LangChain BaseCache).
+
+Tier 1 (exact): hash of the whitespace/case-normalized prompt + model/tool parameters.
+Tier 2 (semantic): the last message of the prompt is embedded with the local MiniLM model
+and compared against earlier prompts that share everything else (model, tools, system
+prompt, history) and the same slot values (emails, dates, times, weekdays; as in the plan cache),
+so "book a demo Tuesday 10:00 AM" never reuses the reply to "... Wednesday 11:00 AM".
+A cosine similarity above the threshold counts as a hit. Only calls without
+bound tools are eligible (the structured Planner output, the summary): a tool-calling reply carries
+arguments taken from its own message, so the support and crisis chains use the exact tier only.
+
+Entries expire after a TTL and are evicted least-recently-used beyond the size limit.
+With LLM_CACHE_PATH set, entries are written through to SQLite and reloaded on startup.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from app.agents.plan_cache import extract_template
+from app.config import Config
+from app.metrics import cache_hits, cache_misses
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    scope TEXT NOT NULL,
+    embedding BLOB,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def _hash(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _binds_tools(llm_string: str) -> bool:
+    # llm_string is "<model>---<sorted call parameters>"; bind_tools() adds a "tools" parameter
+    return "('tools', " in llm_string.split("---", 1)[-1]
+
+
+def _split_prompt(prompt: str) -> Tuple[str, str]:
+    """
+    Splits a serialized message list into (everything but the last message, last message text).
+    The first part scopes the semantic lookup, the second is what gets embedded.
+    Only prompts ending in a user message are eligible (text is "" otherwise):
+    a long system-only prompt such as the Orchestrator's is mostly boilerplate to MiniLM.
+    """
+    try:
+        messages = json.loads(prompt)
+        last = messages[-1]
+        head = json.dumps(messages[:-1], sort_keys=True)
+        content = last["kwargs"]["content"] if last["id"][-1] == "HumanMessage" else ""
+    except (ValueError, KeyError, IndexError, TypeError):
+        return prompt, ""
+    return head, content if isinstance(content, str) else json.dumps(content, sort_keys=True)
+
+
+def _get_embedding_model():
+    # Imported lazily (same model the FAQ retriever already uses)
+    from app.tools.faq_tool import faq_subsystem
+    # Only once loaded: cache lookups never wait for the model to come up
+    faq_retriever = faq_subsystem.peek()
+    return faq_retriever.embedding_model if faq_retriever else None
+
+
+class LLMCache(BaseCache):
+    """Exact + semantic LLM response cache with LRU/TTL eviction and optional SQLite persistence"""
+
+    def __init__(
+        self,
+        max_size: int = Config.SYSTEM_MESSAGE_CACHE_SIZE,
+        ttl: int = Config.LLM_CACHE_TTL,
+        semantic: bool = Config.LLM_SEMANTIC_CACHE,
+        threshold: float = Config.LLM_SEMANTIC_CACHE_THRESHOLD,
+        path: Optional[str] = Config.LLM_CACHE_PATH,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.semantic = semantic
+        self.threshold = threshold
+        self.lock = threading.Lock()
+        # key -> (generations, scope, embedding, created_at); most recently used last
+        self.entries: "OrderedDict[str, Tuple[RETURN_VAL_TYPE, str, Optional[np.ndarray], float]]" = OrderedDict()
+        # scope -> {key: embedding}, the candidates for a semantic hit
+        self.scopes: Dict[str, Dict[str, np.ndarray]] = {}
+        self.counters = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "evictions": 0}
+        self.conn = None
+        if path:
+            self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(SCHEMA)
+            self._load()
+
+    def _load(self):
+        """Reloads unexpired entries from disk, newest first, up to max_size"""
+        rows = self.conn.execute(
+            "SELECT key, scope, embedding, value, created_at FROM llm_cache WHERE created_at > ? "
+            "ORDER BY created_at DESC LIMIT ?",
+            (time.time() - self.ttl, self.max_size),
+        ).fetchall()
+        for key, scope, embedding, value, created_at in reversed(rows):
+            vector = np.frombuffer(embedding, dtype=np.float32) if embedding else None
+            try:
+                self._store(key, loads(value, allowed_objects="core"), scope, vector, created_at)
+            except Exception as e:
+                logger.warning(f"⚠️ Skipping unreadable LLM cache entry: {e}")
+        self.conn.execute("DELETE FROM llm_cache WHERE created_at <= ?", (time.time() - self.ttl,))
+        logger.info(f"✅ Loaded {len(self.entries)} LLM cache entries from disk")
+
+    def _store(self, key: str, value: RETURN_VAL_TYPE, scope: str, vector: Optional[np.ndarray], created_at: float):
+        self._drop(key)
+        self.entries[key] = (value, scope, vector, created_at)
+        if vector is not None:
+            self.scopes.setdefault(scope, {})[key] = vector
+        while len(self.entries) > self.max_size:
+            self._drop(next(iter(self.entries)), persist=True)
+            self.counters["evictions"] += 1
+
+    def _drop(self, key: str, persist: bool = False):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        scope = entry[1]
+        candidates = self.scopes.get(scope)
+        if candidates is not None:
+            candidates.pop(key, None)
+            if not candidates:
+                del self.scopes[scope]
+        if persist and self.conn is not None:
+            self.conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+
+    def _expired(self, created_at: float) -> bool:
+        return time.time() - created_at > self.ttl
+
+    def _exact(self, key: str) -> Optional[RETURN_VAL_TYPE]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry[3]):
+            self._drop(key, persist=True)
+            return None
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        if not self.semantic or not text:
+            return None
+        model = _get_embedding_model()
+        if model is None:
+            return None
+        vector = model.encode([text], normalize_embeddings=True, show_progress_bar=False)[0]
+        return vector.astype(np.float32)
+
+    def _nearest(self, scope: str, vector: np.ndarray) -> Optional[RETURN_VAL_TYPE]:
+        candidates = self.scopes.get(scope)
+        if not candidates:
+            return None
+        keys = list(candidates)
+        scores = np.stack([candidates[k] for k in keys]) @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        return self._exact(keys[best])
+
+    def _keys(self, prompt: str, llm_string: str) -> Tuple[str, str, str]:
+        head, last = _split_prompt(prompt)
+        key = _hash(_normalize(prompt), llm_string)
+        # Slot values are part of the scope: near-duplicates only match when they agree on them
+        _, slots = extract_template(last)
+        scope = _hash(_normalize(head), llm_string, *(_normalize(slot) for slot in slots))
+        # No text to embed: tool-calling entries never enter a semantic scope
+        return key, scope, "" if _binds_tools(llm_string) else last
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key, scope, last = self._keys(prompt, llm_string)
+        with self.lock:
+            value = self._exact(key)
+            if value is not None:
+                self.counters["exact_hits"] += 1
+                cache_hits.inc(cache="llm_exact")
+                return value
+            if not self.scopes.get(scope):
+                self.counters["misses"] += 1
+                cache_misses.inc(cache="llm")
+                return None
+        vector = self._embed(last)
+        with self.lock:
+            value = self._nearest(scope, vector) if vector is not None else None
+            if value is not None:
+                self.counters["semantic_hits"] += 1
+                cache_hits.inc(cache="llm_semantic")
+                logger.info("🎯 Semantic LLM cache hit")
+                return value
+            self.counters["misses"] += 1
+            cache_misses.inc(cache="llm")
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key, scope, last = self._keys(prompt, llm_string)
+        vector = self._embed(last)
+        created_at = time.time()
+        with self.lock:
+            self._store(key, return_val, scope, vector, created_at)
+            if self.conn is not None:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, scope, embedding, value, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, scope, vector.tobytes() if vector is not None else None, dumps(return_val), created_at),
+                )
+
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        # Exact hits are served inline; embedding work goes to a thread
+        key, scope, _ = self._keys(prompt, llm_string)
+        with self.lock:
+            value = self._exact(key)
+            if value is not None:
+                self.counters["exact_hits"] += 1
+                cache_hits.inc(cache="llm_exact")
+                return value
+            if not self.scopes.get(scope):
+                self.counters["misses"] += 1
+                cache_misses.inc(cache="llm")
+                return None
+        return await asyncio.to_thread(self.lookup, prompt, llm_string)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        await asyncio.to_thread(self.update, prompt, llm_string, return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.scopes.clear()
+            if self.conn is not None:
+                self.conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict:
+        lookups = self.counters["exact_hits"] + self.counters["semantic_hits"] + self.counters["misses"]
+        hits = lookups - self.counters["misses"]
+        return {
+            **self.counters,
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+llm_cache = LLMCache() if Config.LLM_CACHE_ENABLED else None
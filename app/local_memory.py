@@ -0,0 +1,182 @@
+"""
+app/local_memory.py
+Embedded long-term memory for single-node deployments (MEMORY_BACKEND=local), no network.
+
+Texts are embedded in-process with MiniLM (the FAQ retriever's model when it loads, otherwise
+a copy of its own). Each user has a shard under MEMORY_LOCAL_DIR:
+
+    <sha256(user_id)>/vectors.f32    raw float32 rows, one normalized embedding each, memory-mapped
+    <sha256(user_id)>/records.jsonl  id / user_id / text per row, same order
+
+Search is an exact dot product over the user's shard only, so the user_id filter costs a
+dictionary lookup. Both files are append-only: a write costs its own rows, and ids already in
+the shard are skipped, so a retried batch (memory_queue) never duplicates a memory.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, List
+
+import numpy as np
+
+from app.config import Config
+from app.memory import MemoryBackend
+from app.metrics import track_dependency
+
+
+class Shard:
+    """One user's memories: memory-mapped vectors plus their records"""
+
+    def __init__(self, path: str, dim: int):
+        self.path = path
+        self.dim = dim
+        self.vectors_path = os.path.join(path, "vectors.f32")
+        self.records_path = os.path.join(path, "records.jsonl")
+        # (vectors, records) swapped as one reference, so a search never sees them out of step
+        self.snapshot = (None, [])
+        # Ids already stored: a retried batch appends nothing twice
+        self.ids = set()
+        if os.path.exists(self.vectors_path):
+            self._recover()
+
+    def _recover(self):
+        """Loads the shard, first cutting both files back to the rows they both hold"""
+        # No records file yet (crash right after the first vectors append): the shard has no rows
+        records, torn = self._read_records() if os.path.exists(self.records_path) else ([], False)
+        row_bytes = self.dim * 4
+        size = os.path.getsize(self.vectors_path)
+        rows = min(len(records), size // row_bytes)
+        # A crash between the two writes leaves extra (or half-written) rows in one of the files;
+        # they are cut off on disk before anything is appended after them
+        if size != rows * row_bytes:
+            os.truncate(self.vectors_path, rows * row_bytes)
+        if torn or len(records) > rows:
+            records = records[:rows]
+            self._rewrite_records(records)
+        self.ids = {record["id"] for record in records}
+        self.snapshot = (self._map(rows), records)
+
+    def _read_records(self):
+        """The records on disk, and whether the file ends in a line that doesn't parse"""
+        records = []
+        with open(self.records_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    return records, True
+        return records, False
+
+    def _rewrite_records(self, records: List[Dict]):
+        temporary = self.records_path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        os.replace(temporary, self.records_path)
+
+    def _map(self, rows: int):
+        if not rows:
+            return None
+        return np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+
+    def append(self, records: List[Dict], vectors: np.ndarray):
+        """Appends the records not stored yet; only the new rows are written"""
+        fresh = [i for i, record in enumerate(records) if record["id"] not in self.ids]
+        if not fresh:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        rows = [{"id": records[i]["id"], "user_id": records[i]["user_id"], "text": records[i]["text"]} for i in fresh]
+        # Vectors first: a record only counts once its vector is on disk
+        with open(self.vectors_path, "ab") as f:
+            f.write(np.ascontiguousarray(vectors[fresh], dtype=np.float32).tobytes())
+        with open(self.records_path, "a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+        records = self.snapshot[1] + rows
+        # Readers holding the previous map keep a valid (shorter) view of the same file
+        self.snapshot = (self._map(len(records)), records)
+        self.ids.update(row["id"] for row in rows)
+
+    def search(self, query: np.ndarray, k: int) -> List[str]:
+        vectors, records = self.snapshot
+        if vectors is None or not len(vectors):
+            return []
+        scores = vectors @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [records[i]["text"] for i in top[np.argsort(-scores[top])]]
+
+
+class LocalMemory(MemoryBackend):
+    """Per-user NumPy shards on disk with in-process MiniLM embeddings"""
+
+    def __init__(self, directory: str = Config.MEMORY_LOCAL_DIR, max_shards: int = Config.MEMORY_LOCAL_SHARDS_CACHED):
+        self.directory = directory
+        self.max_shards = max_shards
+        os.makedirs(self.directory, exist_ok=True)
+        self.embedding_model = self._load_model()
+        self.dim = self.embedding_model.get_sentence_embedding_dimension()
+        # user_id -> open shard, least recently used first
+        self.shards: "OrderedDict[str, Shard]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _load_model(self):
+        # Same model as the FAQ retriever; only loaded twice if the FAQ stack is down
+        from app.tools.faq_tool import faq_subsystem
+        faq_retriever = faq_subsystem.get()
+        if faq_retriever is not None:
+            return faq_retriever.embedding_model
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer('all-MiniLM-L6-v2')
+
+    def _shard(self, user_id: str) -> Shard:
+        """The user's open shard (call with the lock held)"""
+        shard = self.shards.get(user_id)
+        if shard is None:
+            name = hashlib.sha256(user_id.encode("utf-8")).hexdigest()
+            shard = self.shards[user_id] = Shard(os.path.join(self.directory, name), self.dim)
+            while len(self.shards) > self.max_shards:
+                self.shards.popitem(last=False)
+        self.shards.move_to_end(user_id)
+        return shard
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        with track_dependency("local_memory", "encode"):
+            vectors = self.embedding_model.encode(texts, normalize_embeddings=True, show_progress_bar=False)
+        return np.asarray(vectors, dtype=np.float32)
+
+    def _add(self, records: List[Dict]):
+        vectors = self._encode([record["text"] for record in records])
+        by_user = defaultdict(list)
+        for record, vector in zip(records, vectors):
+            by_user[record["user_id"]].append((record, vector))
+        with track_dependency("local_memory", "upsert"):
+            for user_id, rows in by_user.items():
+                # Writers are serialized (and never hold an evicted shard); readers keep the previous mmap
+                with self.lock:
+                    self._shard(user_id).append([record for record, _ in rows], np.stack([vector for _, vector in rows]))
+
+    def _search(self, user_id: str, query: str, k: int) -> List[str]:
+        with self.lock:
+            shard = self._shard(user_id)
+        if shard.snapshot[0] is None:
+            return []
+        vector = self._encode([query])[0]
+        with track_dependency("local_memory", "search"):
+            return shard.search(vector, k)
+
+    async def add_memories(self, records: list):
+        await asyncio.to_thread(self._add, records)
+
+    async def search_memory(self, user_id: str, query: str, k: int = 3) -> list:
+        try:
+            return await asyncio.to_thread(self._search, user_id, query, k)
+        except Exception as e:
+            print(f"Error searching memory: {e}")
+            return []
@@ -1,20 +1,106 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse, PlainTextResponse, JSONResponse
 from pydantic import BaseModel
 from typing import Dict, Any, List
+from contextlib import asynccontextmanager
 from app.graph import create_graph
 from langchain_core.messages import HumanMessage
-from app.memory import PineconeMemory
+from app.memory import memory_subsystem
+from app.memory_queue import memory_writer
+from app.subsystems import warmup_subsystems, readiness
+from app.config import Config
+from app.streaming import stream_registry, produce_graph_events
+from app.checkpoint import run_checkpoint_maintenance
+from app.utils import build_all_chains, get_pool_stats
+from app.llm_cache import llm_cache
+from app.agents.plan_cache import plan_cache
+from app.budget import start_budget
+from app.prefetch import start_prefetch_scope
+from app.admission import admission
+from app.batching import get_batching_stats
+from app.metrics import registry, request_latency
+from app.tracing import start_trace
+from app.recording import start_recording, save_recording
+import asyncio
+import time
 import uuid
 
-app = FastAPI(title="Deep Agent API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the shared LLM client and every registered chain once, before the first request
+    try:
+        build_all_chains()
+    except ValueError as e:
+        print(f"⚠️ Chains not prebuilt: {e}")
+    # Background cleanup of abandoned /chat/stream producers
+    cleanup_task = asyncio.create_task(stream_registry.run_cleanup())
+    # Checkpoint retention + idle-thread eviction (BUFFER_CLEANUP_INTERVAL / BUFFER_TTL)
+    maintenance_task = asyncio.create_task(run_checkpoint_maintenance(graph.checkpointer))
+    # FAQ model, calendar auth and the memory backend load in the background; the server binds right away
+    warmup_task = asyncio.create_task(warmup_subsystems()) if Config.WARMUP_ENABLED else None
+    # Write-behind memory flusher (reloads records left over from the last shutdown)
+    memory_writer.start()
+    yield
+    cleanup_task.cancel()
+    maintenance_task.cancel()
+    if warmup_task:
+        warmup_task.cancel()
+    await memory_writer.stop()
+    memory_client = memory_subsystem.peek()
+    if memory_client:
+        await memory_client.close()
+
+app = FastAPI(title="Deep Agent API", lifespan=lifespan)
 graph = create_graph()
-memory_client = PineconeMemory()
 
 class ChatRequest(BaseModel):
     message: str
     thread_id: str
     user_id: str
 
+def build_inputs(request: ChatRequest) -> Dict[str, Any]:
+    """Graph input for a new user turn"""
+    return {
+        "messages": [HumanMessage(content=request.message)],
+        "user_id": request.user_id,
+        # Initialize other keys if they don't exist in state (handled by graph but good to be explicit for first run)
+        # Note: If resuming, these might be overwritten by state history, which is what we want.
+    }
+
+async def save_user_message(request: ChatRequest):
+    """Long-term memory of the user's input (skipped while the memory backend is unavailable)"""
+    if Config.MEMORY_WRITE_BEHIND:
+        # Written by the background flusher; the response does not wait for it
+        memory_writer.enqueue(request.user_id, request.message)
+        return
+    memory_client = await memory_subsystem.aget()
+    if memory_client is None:
+        print("⚠️ Memory unavailable, message not saved")
+        return
+    await memory_client.add_memory(request.user_id, request.message)
+
+def build_response(final_state: Dict[str, Any]) -> Dict[str, Any]:
+    """Extracts the API response from the final graph state"""
+    messages = final_state['messages']
+    last_message_obj = messages[-1]
+    
+    if isinstance(last_message_obj, HumanMessage):
+        # This means the agent produced NO response.
+        # We should probably return a generic error or log it.
+        print("WARNING: Agent produced no response, preventing echo.")
+        last_message = "I apologize, but I encountered an internal issue and couldn't process your request. Please try again."
+    else:
+        last_message = last_message_obj.content
+    
+    return {
+        "response": last_message,
+        "plan": final_state.get('plan', []),
+        "current_step": final_state.get('current_step_index', 0),
+        "task_complete": final_state.get('task_complete', False),
+        # LLM calls / tokens / wall-clock spent on this request
+        "usage": final_state.get('usage', {})
+    }
+
 @app.post("/chat")
 async def chat_endpoint(request: ChatRequest):
     config = {"configurable": {"thread_id": request.thread_id}}
@@ -23,12 +109,13 @@ async def chat_endpoint(request: ChatRequest):
     # LangGraph MemorySaver handles persistence based on thread_id
     
     # We should add the user message to the state
-    inputs = {
-        "messages": [HumanMessage(content=request.message)],
-        "user_id": request.user_id,
-        # Initialize other keys if they don't exist in state (handled by graph but good to be explicit for first run)
-        # Note: If resuming, these might be overwritten by state history, which is what we want.
-    }
+    inputs = build_inputs(request)
+    
+    # Waits for this thread's previous turn and a free slot (429 when overloaded)
+    ticket = await admission.acquire(request.thread_id)
+    prefetch = None
+    started = time.perf_counter()
+    trace = start_trace("POST /chat", thread_id=request.thread_id, user_id=request.user_id)
     
     # Run the graph
     # We use stream to get the final state
@@ -36,19 +123,13 @@ async def chat_endpoint(request: ChatRequest):
         final_state = None
         # We need to run until it pauses (waiting for input) or finishes
         # graph.invoke runs until end.
+        start_budget()
+        prefetch = start_prefetch_scope()
+        recording = start_recording(request.thread_id, request.user_id, request.message)
         final_state = await graph.ainvoke(inputs, config=config)
-        
-        # Extract response
-        messages = final_state['messages']
-        last_message_obj = messages[-1]
-        
-        if isinstance(last_message_obj, HumanMessage):
-            # This means the agent produced NO response.
-            # We should probably return a generic error or log it.
-            print("WARNING: Agent produced no response, preventing echo.")
-            last_message = "I apologize, but I encountered an internal issue and couldn't process your request. Please try again."
-        else:
-            last_message = last_message_obj.content
+        if recording:
+            recording.finish(final_state)
+            await save_recording(recording)
         
         # Save to memory (long-term) if it's a significant info?
         # For this demo, let's autosave user messages.
@@ -58,22 +139,116 @@ async def chat_endpoint(request: ChatRequest):
         # So we add memory here? Or in the planner?
         # The prompt says: "add_memory(..., text)".
         # Let's add the Human input to memory so future plans know about it.
-        await memory_client.add_memory(request.user_id, request.message)
+        await save_user_message(request)
         
-        return {
-            "response": last_message,
-            "plan": final_state.get('plan', []),
-            "current_step": final_state.get('current_step_index', 0),
-            "task_complete": final_state.get('task_complete', False)
-        }
+        return build_response(final_state)
     except Exception as e:
         import traceback
         error_msg = traceback.format_exc()
         with open("server_error.log", "w") as f:
             f.write(error_msg)
         print(f"ERROR CAUGHT: {error_msg}")
+        if trace:
+            trace.set(error=str(e))
+            trace.status = "error"
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if prefetch:
+            prefetch.cancel_unused()
+        admission.release(ticket)
+        request_latency.observe(time.perf_counter() - started, endpoint="/chat")
+        if trace:
+            trace.end()
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Streams the run as Server-Sent Events:
+    plan -> worker -> token* -> done (or error).
+    """
+    config = {"configurable": {"thread_id": request.thread_id}}
+    inputs = build_inputs(request)
+    
+    async def finalize():
+        snapshot = await graph.aget_state(config)
+        await save_user_message(request)
+        return build_response(snapshot.values)
+    
+    # Admitted before the response starts, so overload is still reported as a 429
+    ticket = await admission.acquire(request.thread_id)
+    try:
+        queue: asyncio.Queue = asyncio.Queue()
+        # Bound before the task is created so the producer's context inherits it
+        start_budget()
+        prefetch = start_prefetch_scope()
+        trace = start_trace("POST /chat/stream", thread_id=request.thread_id, user_id=request.user_id)
+        producer = asyncio.create_task(produce_graph_events(graph, inputs, config, queue, finalize))
+    except BaseException:
+        # No producer owns the slot yet: hand it back or it is lost for good
+        admission.release(ticket)
+        raise
+    # The slot and thread lock are held for as long as the graph runs, not just this handler
+    producer.add_done_callback(lambda _: admission.release(ticket))
+    producer.add_done_callback(lambda _: prefetch.cancel_unused())
+    started = time.perf_counter()
+    producer.add_done_callback(lambda _: request_latency.observe(time.perf_counter() - started, endpoint="/chat/stream"))
+    if trace:
+        producer.add_done_callback(lambda _: trace.end())
+    stream_id = stream_registry.open(request.thread_id, producer)
+    
+    async def event_stream():
+        try:
+            while True:
+                frame = await queue.get()
+                if frame is None:
+                    break
+                stream_registry.touch(stream_id)
+                yield frame
+        finally:
+            # Client went away or stream finished: stop the producer either way
+            stream_registry.close(stream_id)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+@app.get("/ready")
+def readiness_check():
+    """503 until the startup warmup has settled; per-subsystem state either way"""
+    status = readiness()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+@app.get("/stats/llm-pool")
+def llm_pool_stats():
+    return get_pool_stats()
+
+@app.get("/stats/llm-cache")
+def llm_cache_stats():
+    return llm_cache.stats() if llm_cache else {"enabled": False}
+
+@app.get("/stats/plan-cache")
+def plan_cache_stats():
+    return plan_cache.stats() if plan_cache else {"enabled": False}
+
+@app.get("/stats/admission")
+def admission_stats():
+    return admission.stats()
+
+@app.get("/stats/batching")
+def batching_stats():
+    return get_batching_stats()
+
+@app.get("/stats/memory-queue")
+def memory_queue_stats():
+    return memory_writer.stats()
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition of the in-process registry"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
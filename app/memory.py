@@ -1,91 +1,148 @@
 from app.config import Config
-import uuid
+from app.metrics import track_dependency
+from app.subsystems import register_subsystem
 import asyncio
-from pinecone import Pinecone, PineconeAsyncio, ServerlessSpec
+import uuid
+
+def make_record(user_id: str, text: str) -> dict:
+    """A memory as stored in the index (chunk_text is the embedded field)"""
+    return {
+        "id": str(uuid.uuid4()),
+        "chunk_text": text,
+        "user_id": user_id,
+        "text": text
+    }
+
+class MemoryBackend:
+    """
+    Interface of a long-term memory store (MEMORY_BACKEND selects the implementation).
+    Backends implement add_memories and search_memory; bootstrap runs once at warmup.
+    """
+
+    async def bootstrap(self):
+        """One-off setup (remote index, on-disk shards); called by the startup warmup"""
+
+    async def add_memory(self, user_id: str, text: str):
+        await self.add_memories([make_record(user_id, text)])
+        print(f"Memory added for user {user_id}: {text}")
+
+    async def add_memories(self, records: list):
+        """Stores a batch of records built by make_record (any mix of users)"""
+        raise NotImplementedError
+
+    async def search_memory(self, user_id: str, query: str, k: int = 3) -> list:
+        """Texts of the user's k memories most relevant to the query"""
+        raise NotImplementedError
 
-# We need both Async (for data ops) and Sync (for inference, as plugin might be sync only or we wrap it)
-# Actually, the Pinecone client unified structure allows us to use 'pc.inference.embed'
-# But 'PineconeAsyncio' might not have 'inference' plugin support directly out of the box in the same way?
-# Let's use the standard Pinecone client for inference generation, then async for upsert if needed, 
-# or just use sync for inference -> async for upsert.
-# Since we are in an async function, we can await loop.run_in_executor for the sync inference call if needed.
+    async def close(self):
+        """Releases connections / files (API shutdown)"""
+
+class PineconeMemory(MemoryBackend):
+    """
+    Long-term memory on a Pinecone index with integrated embedding.
+    One instance per process (memory_subsystem): a single PineconeAsyncio client with a
+    connection pool sized by PINECONE_POOL_SIZE, and an index handle opened once and reused.
+    The index is resolved (created if missing) once, at warmup or on first use; the hot path
+    makes no control-plane calls unless a data call gets a 404, which re-resolves it once.
+    """
 
-class PineconeMemory:
     def __init__(self):
         self.api_key = Config.PINECONE_API_KEY
         if not self.api_key:
             raise ValueError("PINECONE_API_KEY not set in Config")
         
         self.index_name = Config.PINECONE_INDEX_NAME
-        # Use simple synchronous client for inference operations
-        self.pc_sync = Pinecone(api_key=self.api_key)
+        # Imported here: the SDK is slow to import and only needed once memory is used
+        from pinecone import PineconeAsyncio
+        self.client = PineconeAsyncio(
+            api_key=self.api_key,
+            connection_pool_maxsize=Config.PINECONE_POOL_SIZE,
+            timeout=Config.PINECONE_TIMEOUT,
+        )
+        # Data-plane handle, opened on first use (needs the index host)
+        self.index = None
+        # Concurrent first requests wait for one bootstrap instead of each describing the index
+        self._bootstrap_lock = asyncio.Lock()
         
         # Model to use
         self.model = "multilingual-e5-large" 
 
-    async def _ensure_index(self):
-        """Checks if index exists, create if not (using integrated model)."""
-        # Checks using sync client
-        existing = await asyncio.to_thread(self.pc_sync.list_indexes)
-        existing_names = [i.name for i in existing]
-        
-        if self.index_name not in existing_names:
+    async def _open_index(self):
+        """Describes the index, creating it if missing (using integrated model), and opens a handle"""
+        from pinecone.errors import NotFoundError
+        try:
+            with track_dependency("pinecone", "describe_index"):
+                description = await self.client.describe_index(self.index_name)
+        except NotFoundError:
             print(f"Creating index {self.index_name} with integrated embedding model...")
-            await asyncio.to_thread(
-                 self.pc_sync.create_index_for_model,
-                 name=self.index_name,
-                 cloud="aws",
-                 region="us-east-1",
-                 embed={
-                     "model": "llama-text-embed-v2",
-                     "field_map": {"text": "chunk_text"}
-                 }
-            )
+            with track_dependency("pinecone", "create_index"):
+                description = await self.client.create_index_for_model(
+                    name=self.index_name,
+                    cloud="aws",
+                    region="us-east-1",
+                    embed={
+                        "model": "llama-text-embed-v2",
+                        "field_map": {"text": "chunk_text"}
+                    }
+                )
+        # Long-lived data-plane handle; it shares the client's connection pool settings
+        return self.client.IndexAsyncio(host=description.host)
 
-    async def add_memory(self, user_id: str, text: str):
-        """Adds memory using text-based upsert (Pinecone generates embedding)."""
-        memory_id = str(uuid.uuid4())
-        
-        await self._ensure_index()
-        
-        # Use upsert_records
-        index = self.pc_sync.Index(self.index_name)
-        
-        record = {
-            "id": memory_id,
-            "chunk_text": text,
-            "user_id": user_id,
-            "text": text
-        }
-        
-        await asyncio.to_thread(
-            index.upsert_records,
-            namespace="default", 
-            records=[record]
-        )
-            
-        print(f"Memory added for user {user_id}: {text}")
+    async def bootstrap(self):
+        """The index handle, resolved once (startup warmup or first use)"""
+        if self.index is None:
+            async with self._bootstrap_lock:
+                if self.index is None:
+                    self.index = await self._open_index()
+        return self.index
+
+    async def _refresh(self, stale):
+        """Drops a handle whose index is gone (deleted / recreated) so the next bootstrap re-resolves it"""
+        async with self._bootstrap_lock:
+            if self.index is stale:
+                self.index = None
+                try:
+                    await stale.close()
+                except Exception:
+                    pass
+
+    async def _call(self, operation):
+        """Runs operation(index); on a 404 the cached index is refreshed and the call retried once"""
+        from pinecone.errors import NotFoundError
+        index = await self.bootstrap()
+        try:
+            return await operation(index)
+        except NotFoundError:
+            print(f"Index {self.index_name} not found, refreshing it...")
+            await self._refresh(index)
+            return await operation(await self.bootstrap())
+
+    async def add_memories(self, records: list):
+        """Text-based upsert of a batch (Pinecone generates embeddings); at most 96 records"""
+        async def upsert(index):
+            with track_dependency("pinecone", "upsert"):
+                await index.upsert_records(namespace="default", records=records)
+
+        await self._call(upsert)
 
     async def search_memory(self, user_id: str, query: str, k: int = 3):
         """Searches memory using text query (Pinecone generates embedding)."""
-        
-        # Ensure index exists before searching to avoid 404 on first run
-        await self._ensure_index()
-        
-        index = self.pc_sync.Index(self.index_name)
-        
-        try:
+
+        async def search(index):
             # Use search_records
-            resp = await asyncio.to_thread(
-                index.search_records,
-                namespace="default",
-                query={
-                    "inputs": {"text": query},
-                    "top_k": k,
-                    "filter": {"user_id": user_id}
-                },
-                fields=["text", "chunk_text", "user_id"] # Return fields
-            )
+            with track_dependency("pinecone", "search"):
+                return await index.search_records(
+                    namespace="default",
+                    query={
+                        "inputs": {"text": query},
+                        "top_k": k,
+                        "filter": {"user_id": user_id}
+                    },
+                    fields=["text", "chunk_text", "user_id"] # Return fields
+                )
+
+        try:
+            resp = await self._call(search)
             
             # Extract text from response
             # Response format: {'result': {'hits': [...]}} or similar
@@ -105,6 +162,25 @@ class PineconeMemory:
             print(f"Error searching memory: {e}")
             return []
 
+    async def close(self):
+        """Releases the pooled connections (API shutdown)"""
+        if self.index is not None:
+            await self.index.close()
+        await self.client.close()
+
+def create_memory() -> MemoryBackend:
+    """The backend selected by MEMORY_BACKEND"""
+    if Config.MEMORY_BACKEND == "local":
+        # Imported here: it subclasses MemoryBackend
+        from app.local_memory import LocalMemory
+        return LocalMemory()
+    if Config.MEMORY_BACKEND != "pinecone":
+        raise ValueError(f"Unknown MEMORY_BACKEND: {Config.MEMORY_BACKEND}")
+    return PineconeMemory()
+
+# Shared backend for the API, created on first use or by the startup warmup (which also bootstraps it)
+memory_subsystem = register_subsystem("memory", create_memory, warmup=lambda memory: memory.bootstrap())
+
 if __name__ == "__main__":
     # Test (Async)
     import asyncio
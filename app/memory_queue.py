@@ -0,0 +1,177 @@
+"""
+app/memory_queue.py
+Write-behind ingestion of long-term memories.
+
+/chat enqueues the user's message and returns; a background flusher groups queued records
+across users into one upsert per MEMORY_BATCH_SIZE records or MEMORY_FLUSH_INTERVAL_MS,
+whichever comes first. A failed flush keeps its records at the head of the queue and is
+retried with exponential backoff. The queue is bounded (new records are dropped once
+MEMORY_QUEUE_SIZE are waiting) and what is still queued at shutdown is written to
+MEMORY_QUEUE_FILE, then reloaded on the next startup.
+
+A memory becomes searchable one flush after its turn, not before the response is sent.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, List, Optional
+
+from app.config import Config
+from app.memory import make_record, memory_subsystem
+from app.metrics import memory_flush_latency, memory_queue_depth, memory_records
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryWriter:
+    """Bounded in-process queue of memory records plus the flusher that upserts them in batches"""
+
+    def __init__(
+        self,
+        max_size: int = Config.MEMORY_QUEUE_SIZE,
+        batch_size: int = Config.MEMORY_BATCH_SIZE,
+        flush_interval_ms: float = Config.MEMORY_FLUSH_INTERVAL_MS,
+        path: Optional[str] = Config.MEMORY_QUEUE_FILE,
+    ):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.path = path
+        self.queue: Deque[Dict] = deque()
+        # Set when records are waiting / when a full batch is waiting
+        self.has_records = asyncio.Event()
+        self.batch_ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.failures = 0
+        self.counters = {"enqueued": 0, "written": 0, "dropped": 0, "flushes": 0, "failed_flushes": 0}
+
+    def enqueue(self, user_id: str, text: str) -> bool:
+        """Queues a memory without waiting for it to be written; False if the queue is full"""
+        if len(self.queue) >= self.max_size:
+            self.counters["dropped"] += 1
+            memory_records.inc(outcome="dropped")
+            logger.warning(f"⚠️ Memory queue full ({self.max_size}), message from {user_id} not saved")
+            return False
+        # The id is fixed here, so a retried upsert overwrites instead of duplicating
+        self._push(make_record(user_id, text))
+        self.counters["enqueued"] += 1
+        memory_records.inc(outcome="enqueued")
+        return True
+
+    def _push(self, record: Dict):
+        self.queue.append(record)
+        memory_queue_depth.set(len(self.queue))
+        self.has_records.set()
+        if len(self.queue) >= self.batch_size:
+            self.batch_ready.set()
+
+    async def flush(self) -> int:
+        """Upserts the next batch; records leave the queue only once written"""
+        batch = list(islice(self.queue, self.batch_size))
+        if not batch:
+            return 0
+        started = time.perf_counter()
+        try:
+            memory = await memory_subsystem.aget()
+            if memory is None:
+                raise RuntimeError("Memory unavailable")
+            await memory.add_memories(batch)
+        except Exception:
+            memory_flush_latency.observe(time.perf_counter() - started, status="error")
+            raise
+        memory_flush_latency.observe(time.perf_counter() - started, status="ok")
+        for _ in batch:
+            self.queue.popleft()
+        memory_queue_depth.set(len(self.queue))
+        if not self.queue:
+            self.has_records.clear()
+        if len(self.queue) < self.batch_size:
+            self.batch_ready.clear()
+        self.counters["written"] += len(batch)
+        memory_records.inc(len(batch), outcome="written")
+        return len(batch)
+
+    async def run(self):
+        """Flusher loop (started from the API lifespan)"""
+        while True:
+            await self.has_records.wait()
+            # Give a partial batch up to the flush interval to fill
+            if not self.batch_ready.is_set():
+                try:
+                    await asyncio.wait_for(self.batch_ready.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            try:
+                await self.flush()
+                self.counters["flushes"] += 1
+                self.failures = 0
+            except Exception as e:
+                self.counters["failed_flushes"] += 1
+                self.failures += 1
+                delay = min(Config.MEMORY_RETRY_BASE_SECONDS * 2 ** (self.failures - 1), Config.MEMORY_RETRY_MAX_SECONDS)
+                logger.warning(f"⚠️ Memory flush failed ({e}), {len(self.queue)} queued, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    def start(self):
+        """Reloads records persisted by the last shutdown and starts the flusher"""
+        # Fresh events: they bind to the running loop (tests and benchmarks start several)
+        self.has_records, self.batch_ready = asyncio.Event(), asyncio.Event()
+        self._load()
+        if self.queue:
+            self.has_records.set()
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stops the flusher, makes a last attempt to write the queue, then persists what is left"""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        try:
+            await asyncio.wait_for(self._drain(), Config.MEMORY_DRAIN_SECONDS)
+        except Exception as e:
+            logger.warning(f"⚠️ Memory queue not drained at shutdown: {e}")
+        self._persist()
+
+    async def _drain(self):
+        while self.queue:
+            await self.flush()
+
+    def _persist(self):
+        if not self.queue or not self.path:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            for record in self.queue:
+                f.write(json.dumps(record) + "\n")
+        logger.info(f"💾 Persisted {len(self.queue)} queued memories to {self.path}")
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            records: List[Dict] = [json.loads(line) for line in f if line.strip()]
+        os.remove(self.path)
+        for record in records[-self.max_size:]:
+            self._push(record)
+        logger.info(f"✅ Reloaded {len(records)} queued memories from {self.path}")
+
+    def stats(self) -> Dict:
+        return {
+            **self.counters,
+            "depth": len(self.queue),
+            "max_size": self.max_size,
+            "batch_size": self.batch_size,
+            "consecutive_failures": self.failures,
+        }
+
+
+memory_writer = MemoryWriter()
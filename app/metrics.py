@@ -0,0 +1,225 @@
+"""
+app/metrics.py
+In-process metrics registry rendered in the Prometheus text format at /metrics.
+
+Counters, gauges and fixed-bucket histograms with labels. No client library needed:
+everything lives in this process and is read on scrape.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from app.recording import record_node
+from app.tracing import span
+
+# Seconds; LLM calls and calendar round trips need the long tail
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: Sequence[str], values: Tuple, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(labelnames, values)) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self.lock:
+            items = list(self.values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self.lock:
+            self.values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> (per-bucket counts, sum, count)
+        self.values: Dict[Tuple, List] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self.lock:
+            entry = self.values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][index] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes the duration of the block (errors included)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        with self.lock:
+            items = [(k, (list(v[0]), v[1], v[2])) for k, v in self.values.items()]
+        lines = self.header()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+node_latency = registry.register(Histogram(
+    "deepagent_node_duration_seconds", "Graph node execution time", ["node"]))
+llm_latency = registry.register(Histogram(
+    "deepagent_llm_call_duration_seconds", "LLM call latency", ["model", "status"]))
+dependency_latency = registry.register(Histogram(
+    "deepagent_dependency_duration_seconds", "External dependency call latency (pinecone, calendar, faiss)",
+    ["dependency", "operation"]))
+request_latency = registry.register(Histogram(
+    "deepagent_request_duration_seconds", "End-to-end chat request latency", ["endpoint"]))
+
+retry_counter = registry.register(Counter(
+    "deepagent_step_retries_total", "Reviewer retries of a failed step", ["outcome"]))
+cache_hits = registry.register(Counter(
+    "deepagent_cache_hits_total", "Cache hits", ["cache"]))
+cache_misses = registry.register(Counter(
+    "deepagent_cache_misses_total", "Cache misses", ["cache"]))
+tool_errors = registry.register(Counter(
+    "deepagent_tool_errors_total", "Tool calls that failed or could not run", ["tool"]))
+requests_in_flight = registry.register(Gauge(
+    "deepagent_requests_in_flight", "Admitted chat requests, by state", ["state"]))
+requests_rejected = registry.register(Counter(
+    "deepagent_requests_rejected_total", "Chat requests rejected by admission control", ["reason"]))
+memory_queue_depth = registry.register(Gauge(
+    "deepagent_memory_queue_depth", "Memory records waiting for the write-behind flusher"))
+memory_flush_latency = registry.register(Histogram(
+    "deepagent_memory_flush_duration_seconds", "Batched memory upsert latency", ["status"]))
+memory_records = registry.register(Counter(
+    "deepagent_memory_records_total", "Memory records by outcome (enqueued, written, dropped)", ["outcome"]))
+
+
+def instrument_node(name: str, node):
+    """Wraps an async graph node so its execution time is recorded (and traced)"""
+    async def timed_node(state):
+        record_node(name)
+        with node_latency.time(node=name), span(name, kind="node"):
+            return await node(state)
+    timed_node.__name__ = getattr(node, "__name__", name)
+    return timed_node
+
+
+@contextmanager
+def track_dependency(dependency: str, operation: str):
+    """Times an external call and records it as a span of the current trace"""
+    with dependency_latency.time(dependency=dependency, operation=operation), \
+            span(f"{dependency}.{operation}", kind="dependency"):
+        yield
+
+
+class MetricsCallback(BaseCallbackHandler):
+    """Times every call of the shared LLM"""
+
+    run_inline = True
+
+    def __init__(self):
+        self.started: Dict[UUID, Tuple[float, str]] = {}
+
+    def _start(self, run_id: UUID, kwargs: Dict):
+        params = kwargs.get("invocation_params") or {}
+        self.started[run_id] = (time.perf_counter(), params.get("model_name") or params.get("model", ""))
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs):
+        self._start(run_id, kwargs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs):
+        self._start(run_id, kwargs)
+
+    def _end(self, run_id: UUID, status: str):
+        started = self.started.pop(run_id, None)
+        if started:
+            llm_latency.observe(time.perf_counter() - started[0], model=started[1], status=status)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        self._end(run_id, "ok")
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs):
+        self._end(run_id, "error")
+
+
+metrics_callback = MetricsCallback()
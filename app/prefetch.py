@@ -0,0 +1,140 @@
+"""
+app/prefetch.py
+Speculative tool prefetch.
+
+Right after planning, the data the steps will most likely need is fetched in the background
+(calendar availability for booking steps, the FAQ search for support steps), so calendar and
+FAISS latency overlaps with the Orchestrator and worker LLM calls. Workers and tools read a
+result only if its key matches what they would have fetched; whatever was never read is
+cancelled when the request ends.
+
+The per-request scope lives in a context variable, like the request budget.
+"""
+
+import asyncio
+import logging
+import re
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+DATE_PATTERN = re.compile(
+    r"\b(\d{4}-\d{2}-\d{2}|\d{1,2}[/-]\d{1,2}[/-]\d{4}"
+    r"|\d{1,2} (?:january|february|march|april|may|june|july|august|september|october|november|december) \d{4}"
+    r"|(?:next )?(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)|today|tomorrow)\b",
+    re.IGNORECASE,
+)
+
+
+def faq_key(query: str) -> Tuple[str, str]:
+    return ("faq", " ".join(query.split()).casefold())
+
+
+def slots_key(date_str: str) -> Tuple[str, str]:
+    return ("slots", date_str)
+
+
+class RequestPrefetch:
+    """Background fetches started for one request"""
+
+    def __init__(self):
+        self.tasks: Dict[Tuple, asyncio.Task] = {}
+        self.step_keys: Dict[int, List[Tuple]] = {}
+        self.used = set()
+
+    def start(self, key: Tuple, step_index: int, coroutine_factory):
+        if key not in self.tasks:
+            self.tasks[key] = asyncio.create_task(coroutine_factory())
+        self.step_keys.setdefault(step_index, []).append(key)
+
+    async def get(self, key: Tuple) -> Optional[Any]:
+        """Result of a prefetch (waiting for it if still running); None if there is none or it failed"""
+        task = self.tasks.get(key)
+        if task is None:
+            return None
+        self.used.add(key)
+        try:
+            return await asyncio.shield(task)
+        except Exception as e:
+            logger.warning(f"⚠️ Prefetch {key} failed: {e}")
+            return None
+
+    def keys_for_step(self, step_index: int) -> List[Tuple]:
+        return self.step_keys.get(step_index, [])
+
+    def cancel_unused(self) -> int:
+        cancelled = 0
+        for key, task in self.tasks.items():
+            if key in self.used:
+                continue
+            if not task.done():
+                task.cancel()
+                cancelled += 1
+            elif not task.cancelled():
+                # Consume the outcome so a failed, unused fetch is not reported as "never retrieved"
+                task.exception()
+        if self.tasks:
+            logger.info(f"🔮 Prefetch: {len(self.used)}/{len(self.tasks)} used, {cancelled} cancelled")
+        return cancelled
+
+
+current_prefetch: ContextVar[Optional[RequestPrefetch]] = ContextVar("current_prefetch", default=None)
+
+
+def start_prefetch_scope() -> RequestPrefetch:
+    """Creates the prefetch scope for a new request and binds it to the current context"""
+    scope = RequestPrefetch()
+    current_prefetch.set(scope)
+    return scope
+
+
+def extract_date(text: str) -> Optional[str]:
+    """First date mentioned in the text, resolved to YYYY-MM-DD the same way the booking tool does"""
+    from app.tools.booking_tool import normalize_date
+    match = DATE_PATTERN.search(text)
+    if not match:
+        return None
+    date_str = normalize_date(match.group(1))
+    return date_str if re.fullmatch(r"\d{4}-\d{2}-\d{2}", date_str) else None
+
+
+def schedule_prefetch(plan: List[str], step_workers: List[str], user_message: str):
+    """Starts the fetches the planned steps are likely to need"""
+    scope = current_prefetch.get()
+    if scope is None or not Config.PREFETCH_ENABLED:
+        return
+    # Only subsystems that are already up: prefetch must never wait for a cold start
+    from app.tools.booking_tool import calendar_subsystem
+    from app.tools.faq_tool import faq_subsystem
+    calendar_manager, faq_retriever = calendar_subsystem.peek(), faq_subsystem.peek()
+
+    for index, (step, worker) in enumerate(zip(plan, step_workers)):
+        if worker == "BookingAgent" and calendar_manager:
+            date_str = extract_date(step) or extract_date(user_message)
+            if date_str:
+                scope.start(slots_key(date_str), index, lambda d=date_str: calendar_manager.get_available_slots(d))
+        elif worker == "SupportAgent" and faq_retriever:
+            scope.start(faq_key(user_message), index, lambda: faq_retriever.asearch(user_message, top_k=1))
+
+
+async def prefetched(key: Tuple) -> Optional[Any]:
+    """Prefetched result for `key` in the current request, or None (caller fetches it itself)"""
+    scope = current_prefetch.get()
+    return await scope.get(key) if scope else None
+
+
+async def prefetched_for_step(step_index: int, kind: str) -> Dict[str, Any]:
+    """All prefetched results of one kind ("slots" / "faq") started for a step, by key value"""
+    scope = current_prefetch.get()
+    if scope is None:
+        return {}
+    results = {}
+    for key in scope.keys_for_step(step_index):
+        if key[0] == kind:
+            value = await scope.get(key)
+            if value is not None:
+                results[key[1]] = value
+    return results
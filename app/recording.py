@@ -0,0 +1,226 @@
+"""
+app/recording.py
+Record / replay of /chat turns.
+
+Recording (RECORDING_ENABLED): each turn stores its input, every LLM response and tool result
+(with durations), the graph nodes that ran and the final response, as one JSON line appended to
+RECORDING_DIR/<thread_id>.jsonl.
+
+Replay (python -m benchmarks.replay): the same hooks answer LLM calls and tools from a recorded
+turn instead, so production traffic reruns deterministically through create_graph().
+
+Like the request budget, the active recording (or replay) lives in a context variable.
+"""
+
+import asyncio
+import importlib
+import json
+import logging
+import os
+import re
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+
+from langchain_core.load import dumpd, load
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableLambda
+from pydantic import BaseModel
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayMiss(Exception):
+    """The graph made a call the recording has no answer for (the run diverged)"""
+
+
+def dump_output(value: Any) -> Dict:
+    """JSON-safe form of an LLM output: a message or a structured-output model"""
+    if isinstance(value, BaseMessage):
+        return {"kind": "message", "data": dumpd(value)}
+    if isinstance(value, BaseModel):
+        cls = type(value)
+        return {"kind": "model", "class": f"{cls.__module__}:{cls.__qualname__}", "data": value.model_dump()}
+    return {"kind": "value", "data": value}
+
+
+def load_output(entry: Dict) -> Any:
+    if entry["kind"] == "message":
+        return load(entry["data"], allowed_objects="core")
+    if entry["kind"] == "model":
+        module, name = entry["class"].split(":")
+        return getattr(importlib.import_module(module), name).model_validate(entry["data"])
+    return entry["data"]
+
+
+class TurnRecording:
+    """Everything one production turn did, in call order"""
+
+    def __init__(self, thread_id: str, user_id: str, message: str):
+        self.thread_id = thread_id
+        self.user_id = user_id
+        self.message = message
+        self.recorded_at = time.time()
+        self._start = time.perf_counter()
+        self.nodes: List[str] = []
+        self.llm_calls: List[Dict] = []
+        self.tool_calls: List[Dict] = []
+        self.result: Dict = {}
+
+    def on_node(self, name: str):
+        self.nodes.append(name)
+
+    def on_llm(self, chain_name: str, output: Any, seconds: float):
+        self.llm_calls.append({"chain": chain_name, "output": dump_output(output), "seconds": round(seconds, 4)})
+
+    def on_tool(self, tool_name: str, args: Dict, output: Any, seconds: float):
+        self.tool_calls.append({"tool": tool_name, "args": args, "output": output, "seconds": round(seconds, 4)})
+
+    def finish(self, final_state: Dict):
+        messages = final_state.get('messages') or []
+        self.result = {
+            "response": messages[-1].content if messages else "",
+            "retries": sum((final_state.get('step_retries') or {}).values()),
+            "seconds": round(time.perf_counter() - self._start, 4),
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            "thread_id": self.thread_id,
+            "user_id": self.user_id,
+            "message": self.message,
+            "recorded_at": self.recorded_at,
+            "nodes": self.nodes,
+            "llm_calls": self.llm_calls,
+            "tool_calls": self.tool_calls,
+            **self.result,
+        }
+
+
+class TurnReplay:
+    """Serves a recorded turn's LLM and tool results back, in order, per chain / tool"""
+
+    def __init__(self, turn: Dict):
+        self.turn = turn
+        self.llm: Dict[str, Deque[Dict]] = {}
+        for call in turn.get("llm_calls", []):
+            self.llm.setdefault(call["chain"], deque()).append(call)
+        self.tools: Dict[str, Deque[Dict]] = {}
+        for call in turn.get("tool_calls", []):
+            self.tools.setdefault(call["tool"], deque()).append(call)
+        self.nodes: List[str] = []
+        self.llm_calls = 0
+        self.tool_calls = 0
+        self.divergences: List[str] = []
+
+    def on_node(self, name: str):
+        self.nodes.append(name)
+
+    def next_llm(self, chain_name: str) -> Any:
+        self.llm_calls += 1
+        calls = self.llm.get(chain_name)
+        if not calls:
+            self.divergences.append(f"unrecorded LLM call: {chain_name}")
+            raise ReplayMiss(f"No recorded response left for chain '{chain_name}'")
+        return load_output(calls.popleft()["output"])
+
+    def next_tool(self, tool_name: str, args: Dict) -> Any:
+        self.tool_calls += 1
+        calls = self.tools.get(tool_name)
+        if not calls:
+            self.divergences.append(f"unrecorded tool call: {tool_name}")
+            raise ReplayMiss(f"No recorded result left for tool '{tool_name}'")
+        call = calls.popleft()
+        if call["args"] != args:
+            self.divergences.append(f"{tool_name} called with different arguments")
+        return call["output"]
+
+    def unused(self) -> List[str]:
+        """Recorded calls the replay never made"""
+        left = [f"LLM {name}" for name, calls in self.llm.items() for _ in calls]
+        return left + [f"tool {name}" for name, calls in self.tools.items() for _ in calls]
+
+
+current_recording: ContextVar[Optional[Any]] = ContextVar("current_recording", default=None)
+
+
+def start_recording(thread_id: str, user_id: str, message: str) -> Optional[TurnRecording]:
+    """Starts recording the current turn (when RECORDING_ENABLED) and binds it to the context"""
+    if not Config.RECORDING_ENABLED:
+        return None
+    recording = TurnRecording(thread_id, user_id, message)
+    current_recording.set(recording)
+    return recording
+
+
+def start_replay(turn: Dict) -> TurnReplay:
+    replay = TurnReplay(turn)
+    current_recording.set(replay)
+    return replay
+
+
+def record_node(name: str):
+    session = current_recording.get()
+    if session is not None:
+        session.on_node(name)
+
+
+def record_llm(chain_name: str, output: Any, seconds: float = 0.0):
+    """Records an LLM result obtained without a call of its own (plan cache hit, coalesced batch call)"""
+    session = current_recording.get()
+    if isinstance(session, TurnRecording):
+        session.on_llm(chain_name, output, seconds)
+
+
+def recorded_chain(chain_name: str, chain):
+    """Wraps a registered chain so each call's output lands in the active recording"""
+    async def call(inputs, config):
+        started = time.perf_counter()
+        result = await chain.ainvoke(inputs, config)
+        record_llm(chain_name, result, time.perf_counter() - started)
+        return result
+    return RunnableLambda(call, name=chain_name)
+
+
+def replay_chain(chain_name: str):
+    """Chain answering from the active TurnReplay (registered in place of the real one by the replay harness)"""
+    async def call(inputs):
+        session = current_recording.get()
+        if not isinstance(session, TurnReplay):
+            raise ReplayMiss(f"Chain '{chain_name}' called outside a replay")
+        return session.next_llm(chain_name)
+    return RunnableLambda(call, name=chain_name)
+
+
+async def run_tool(tool, args: Dict) -> Any:
+    """Invokes a worker's tool: recorded while recording, answered from the recording while replaying"""
+    session = current_recording.get()
+    if isinstance(session, TurnReplay):
+        return session.next_tool(tool.name, args)
+    started = time.perf_counter()
+    output = await tool.ainvoke(args)
+    if isinstance(session, TurnRecording):
+        session.on_tool(tool.name, args, output, time.perf_counter() - started)
+    return output
+
+
+def recording_path(thread_id: str) -> str:
+    safe_id = re.sub(r"[^\w.-]", "_", thread_id)
+    return os.path.join(Config.RECORDING_DIR, f"{safe_id}.jsonl")
+
+
+def _append(recording: TurnRecording):
+    os.makedirs(Config.RECORDING_DIR, exist_ok=True)
+    with open(recording_path(recording.thread_id), "a") as f:
+        f.write(json.dumps(recording.to_dict(), default=str) + "\n")
+
+
+async def save_recording(recording: TurnRecording):
+    """Appends the turn to its thread's session file, off the event loop"""
+    try:
+        await asyncio.to_thread(_append, recording)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not save recording of {recording.thread_id}: {e}")
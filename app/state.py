@@ -2,11 +2,25 @@ from typing import TypedDict, List, Dict, Annotated
 import operator
 from langchain_core.messages import BaseMessage
 
+def merge_step_results(current: Dict, update: Dict) -> Dict:
+    """Parallel branches each report their own step; an empty update resets the results (new plan)"""
+    if not update:
+        return {}
+    return {**(current or {}), **update}
+
 class DeepAgentState(TypedDict):
     messages: Annotated[List[BaseMessage], operator.add]
     plan: List[str]
+    step_workers: List[str]
+    step_dependencies: List[List[int]]
     current_step_index: int
+    active_steps: List[int]
+    step_results: Annotated[Dict[int, Dict], merge_step_results]
     scratchpad: Dict
+    conversation_summary: str
+    summarized_message_count: int
     task_complete: bool
+    step_retries: Dict[int, int]
+    usage: Dict
     user_id: str
     next_worker: str
@@ -0,0 +1,114 @@
+"""
+app/streaming.py
+Server-Sent Events helpers for the /chat/stream endpoint.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Dict, Optional
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Nodes whose LLM tokens are forwarded to the client.
+# Planner / Orchestrator tokens are structured output and are reported as events instead.
+WORKER_NODES = {"BookingAgent", "SupportAgent", "CrisisAgent"}
+
+
+def format_sse(event: str, data: Dict) -> str:
+    """Format a single Server-Sent Event frame"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class StreamRegistry:
+    """Tracks live streams so abandoned ones can be cancelled"""
+
+    def __init__(self, ttl: int = Config.STREAM_TTL):
+        self.ttl = ttl
+        # stream_id -> {"task": asyncio.Task, "thread_id": str, "last_activity": float}
+        self.streams: Dict[str, Dict] = {}
+
+    def open(self, thread_id: str, task: asyncio.Task) -> str:
+        stream_id = str(uuid.uuid4())
+        self.streams[stream_id] = {
+            "task": task,
+            "thread_id": thread_id,
+            "last_activity": time.monotonic(),
+        }
+        return stream_id
+
+    def touch(self, stream_id: str):
+        """Mark the stream as still being consumed"""
+        if stream_id in self.streams:
+            self.streams[stream_id]["last_activity"] = time.monotonic()
+
+    def close(self, stream_id: str):
+        """Stop the producer task (if still running) and forget the stream"""
+        entry = self.streams.pop(stream_id, None)
+        if entry and not entry["task"].done():
+            entry["task"].cancel()
+
+    def cleanup(self, now: Optional[float] = None) -> int:
+        """Cancel streams that have not been consumed for longer than the TTL"""
+        now = now if now is not None else time.monotonic()
+        expired = [
+            stream_id for stream_id, entry in self.streams.items()
+            if entry["task"].done() or now - entry["last_activity"] > self.ttl
+        ]
+        for stream_id in expired:
+            self.close(stream_id)
+        if expired:
+            logger.info(f"🧹 Cleaned up {len(expired)} abandoned stream(s)")
+        return len(expired)
+
+    async def run_cleanup(self, interval: int = Config.STREAM_CLEANUP_INTERVAL):
+        """Background loop that periodically drops abandoned streams"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.cleanup()
+            except Exception as e:
+                logger.error(f"❌ Stream cleanup failed: {e}")
+
+
+stream_registry = StreamRegistry()
+
+
+async def produce_graph_events(graph, inputs: Dict, config: Dict, queue: asyncio.Queue, finalize):
+    """
+    Runs the graph with astream_events and pushes SSE frames onto the queue.
+    `finalize` is awaited once the graph finishes and its result is sent as the "done" event.
+    A final None marks the end of the stream.
+    """
+    try:
+        async for event in graph.astream_events(inputs, config=config, version="v2"):
+            kind = event["event"]
+            name = event.get("name")
+            node = event.get("metadata", {}).get("langgraph_node")
+
+            if kind == "on_chain_end" and name == "Planner" and node == "Planner":
+                output = event["data"].get("output") or {}
+                await queue.put(format_sse("plan", {"plan": output.get("plan", []), "workers": output.get("step_workers", [])}))
+
+            elif kind == "on_chain_end" and name == "Orchestrator" and node == "Orchestrator":
+                output = event["data"].get("output") or {}
+                await queue.put(format_sse("worker", {"worker": output.get("next_worker"), "steps": output.get("active_steps", [])}))
+
+            elif kind == "on_chat_model_stream" and node in WORKER_NODES:
+                chunk = event["data"].get("chunk")
+                content = getattr(chunk, "content", "")
+                if content and isinstance(content, str):
+                    await queue.put(format_sse("token", {"node": node, "content": content}))
+
+        await queue.put(format_sse("done", await finalize()))
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Stream failed: {e}", exc_info=True)
+        await queue.put(format_sse("error", {"detail": str(e)}))
+    finally:
+        queue.put_nowait(None)
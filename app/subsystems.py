@@ -0,0 +1,117 @@
+"""
+app/subsystems.py
+Lazily initialized heavy dependencies (FAQ index + MiniLM, Google Calendar, memory backend).
+
+Nothing is loaded at import time. Each subsystem is built once, on first use or by the
+background warmup started from the API lifespan, and reports its state at /ready:
+pending -> loading -> ready | failed (retried after SUBSYSTEM_RETRY_SECONDS).
+
+- get()   builds the subsystem if needed (blocking; call from a thread)
+- aget()  same, off the event loop
+- peek()  the instance only if already ready, never blocks (speculative / optional callers)
+
+A subsystem may also register an async warmup hook (e.g. resolving a remote index), run by the
+background warmup once the instance is built.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class Subsystem:
+    def __init__(self, name: str, factory: Callable[[], Any], warmup: Optional[Callable[[Any], Awaitable]] = None):
+        self.name = name
+        self.factory = factory
+        self.warmup = warmup
+        self.state = "pending"
+        self.instance: Any = None
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.failed_at = 0.0
+        self.overridden = False
+        self.lock = threading.Lock()
+
+    def get(self) -> Optional[Any]:
+        """The instance, building it on first use; None if it failed to initialize"""
+        if self.state == "ready":
+            return self.instance
+        with self.lock:
+            if self.state == "ready":
+                return self.instance
+            if self.state == "failed" and time.monotonic() - self.failed_at < Config.SUBSYSTEM_RETRY_SECONDS:
+                return None
+            self.state = "loading"
+            started = time.perf_counter()
+            try:
+                self.instance = self.factory()
+                self.state = "ready"
+                self.error = None
+                logger.info(f"✅ {self.name} ready in {time.perf_counter() - started:.2f}s")
+            except Exception as e:
+                self.state = "failed"
+                self.error = str(e)
+                self.failed_at = time.monotonic()
+                logger.error(f"⚠️ {self.name} failed to initialize: {e}")
+            self.load_seconds = round(time.perf_counter() - started, 3)
+            return self.instance if self.state == "ready" else None
+
+    async def aget(self) -> Optional[Any]:
+        if self.state == "ready":
+            return self.instance
+        return await asyncio.to_thread(self.get)
+
+    def peek(self) -> Optional[Any]:
+        return self.instance if self.state == "ready" else None
+
+    def override(self, instance: Any):
+        """Installs a ready-made instance (benchmarks / stand-ins); the warmup hook is skipped for it"""
+        with self.lock:
+            self.instance = instance
+            self.overridden = True
+            self.state = "ready"
+            self.error = None
+
+    def status(self) -> Dict:
+        return {"state": self.state, "load_seconds": self.load_seconds, "error": self.error}
+
+
+_subsystems: Dict[str, Subsystem] = {}
+
+
+def register_subsystem(name: str, factory: Callable[[], Any], warmup: Optional[Callable[[Any], Awaitable]] = None) -> Subsystem:
+    if name not in _subsystems:
+        _subsystems[name] = Subsystem(name, factory, warmup)
+    return _subsystems[name]
+
+
+async def _warm(subsystem: Subsystem):
+    instance = await subsystem.aget()
+    if instance is None or subsystem.warmup is None or subsystem.overridden:
+        return
+    try:
+        await subsystem.warmup(instance)
+    except Exception as e:
+        # Not fatal: the same work happens lazily on first use
+        logger.warning(f"⚠️ {subsystem.name} warmup failed: {e}")
+
+
+async def warmup_subsystems():
+    """Initializes every registered subsystem in parallel, in worker threads"""
+    started = time.perf_counter()
+    await asyncio.gather(*(_warm(subsystem) for subsystem in _subsystems.values()))
+    states = ", ".join(f"{name}={subsystem.state}" for name, subsystem in _subsystems.items())
+    logger.info(f"🔥 Warmup finished in {time.perf_counter() - started:.2f}s ({states})")
+
+
+def readiness() -> Dict:
+    """Ready once no subsystem is still pending or loading (failed ones degrade, they don't block)"""
+    subsystems = {name: subsystem.status() for name, subsystem in _subsystems.items()}
+    ready = all(status["state"] in ("ready", "failed") for status in subsystems.values())
+    return {"ready": ready, "subsystems": subsystems}
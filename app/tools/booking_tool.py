@@ -3,16 +3,14 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 import os
 import asyncio
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from google.auth.exceptions import RefreshError
-from googleapiclient.discovery import build
 import uuid
 import logging
 import re
 import pytz
 from app.config import Config
+from app.prefetch import prefetched, slots_key
+from app.metrics import track_dependency, tool_errors
+from app.subsystems import register_subsystem
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +36,12 @@ class GoogleCalendarManager:
     
     def _authenticate(self):
         """Authenticate with Google Calendar with Robust Error Handling"""
+        # Google SDK imports are slow; they only happen once the calendar is actually needed
+        from google.oauth2.credentials import Credentials
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        from google.auth.transport.requests import Request
+        from google.auth.exceptions import RefreshError
+        from googleapiclient.discovery import build
         creds = None
         
         try:
@@ -91,7 +95,8 @@ class GoogleCalendarManager:
         """Check if a specific time slot is available (Non-blocking)"""
         if not self.service: return False
         
-        return await asyncio.to_thread(self._is_slot_available_sync, date_str, time_slot)
+        with track_dependency("calendar", "is_slot_available"):
+            return await asyncio.to_thread(self._is_slot_available_sync, date_str, time_slot)
 
     def _is_slot_available_sync(self, date_str: str, time_slot: str) -> bool:
         """Synchronous implementation of availability check"""
@@ -136,7 +141,8 @@ class GoogleCalendarManager:
         """Get available slots from Google Calendar (Non-blocking)"""
         if not self.service: return []
         
-        return await asyncio.to_thread(self._get_available_slots_sync, date_str, num_slots)
+        with track_dependency("calendar", "get_available_slots"):
+            return await asyncio.to_thread(self._get_available_slots_sync, date_str, num_slots)
 
     def _get_available_slots_sync(self, date_str: str = None, num_slots: int = 5) -> List[str]:
         """Synchronous implementation of getting slots"""
@@ -198,7 +204,8 @@ class GoogleCalendarManager:
         """Book a meeting (Non-blocking)"""
         if not self.service: raise Exception("Calendar service not authenticated")
 
-        return await asyncio.to_thread(self._book_meeting_sync, user_email, slot, meeting_title, date_str)
+        with track_dependency("calendar", "book_meeting"):
+            return await asyncio.to_thread(self._book_meeting_sync, user_email, slot, meeting_title, date_str)
 
     def _book_meeting_sync(self, user_email: str, slot: str, meeting_title: str, date_str: str) -> Dict:
         """Synchronous implementation of booking"""
@@ -265,7 +272,8 @@ class GoogleCalendarManager:
         """Cancel a meeting based on user email and reason (Non-blocking)"""
         if not self.service: return None
         
-        return await asyncio.to_thread(self._cancel_meeting_sync, user_email, reason)
+        with track_dependency("calendar", "cancel_meeting"):
+            return await asyncio.to_thread(self._cancel_meeting_sync, user_email, reason)
 
     def _cancel_meeting_sync(self, user_email: str, reason: str) -> Optional[str]:
         """Synchronous implementation of meeting cancellation"""
@@ -310,12 +318,63 @@ class GoogleCalendarManager:
             return None
 
 
-# Global instance
-try:
-    calendar_manager = GoogleCalendarManager()
-except Exception as e:
-    logger.error(f"⚠️ Failed to initialize Calendar Manager: {e}")
-    calendar_manager = None
+def connect_calendar() -> GoogleCalendarManager:
+    manager = GoogleCalendarManager()
+    if not manager.service:
+        raise RuntimeError("Google Calendar is not authenticated")
+    return manager
+
+
+# Global instance, authenticated on first use or by the startup warmup (never at import)
+calendar_subsystem = register_subsystem("calendar", connect_calendar)
+
+
+def normalize_date(date: str) -> str:
+    """Resolves "today", "tomorrow", weekdays and common formats to YYYY-MM-DD (lower-cased input otherwise)"""
+    date_str = date
+    if date_str and isinstance(date_str, str):
+        date_str = date_str.lower().strip()
+        try:
+            today = datetime.now()
+            target_date = None
+            
+            if date_str == "today":
+                target_date = today
+            elif date_str == "tomorrow":
+                target_date = today + timedelta(days=1)
+            elif date_str.startswith("next ") or date_str in ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]:
+                weekdays = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+                target_day = date_str.replace("next ", "").strip()
+                
+                if target_day in weekdays:
+                    current_weekday = today.weekday()
+                    target_weekday = weekdays.index(target_day)
+                    
+                    days_ahead = target_weekday - current_weekday
+                    if days_ahead <= 0: # Target day already happened this week
+                        days_ahead += 7
+                    if "next " in date_str: 
+                         # Logic: If today is Monday and user says "next Monday", usually means 7 days later.
+                         if days_ahead < 7:
+                             days_ahead += 7
+                    
+                    target_date = today + timedelta(days=days_ahead)
+            
+            if target_date:
+                # Format to YYYY-MM-DD
+                date_str = target_date.strftime("%Y-%m-%d")
+            else:
+                # Try simple parse
+                for fmt in ["%d %B %Y", "%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y"]:
+                    try:
+                        parsed = datetime.strptime(date, fmt)
+                        date_str = parsed.strftime("%Y-%m-%d")
+                        break
+                    except:
+                        continue
+        except Exception as e:
+            logger.warning(f"⚠️ Date parsing warning: {e}")
+    return date_str
 
 
 @tool
@@ -364,56 +423,16 @@ async def booking_agent_tool(
 
 
     # Normalize date if needed
-    date_str = date
-    if date_str and isinstance(date_str, str):
-        date_str = date_str.lower().strip()
-        try:
-            today = datetime.now()
-            target_date = None
-            
-            if date_str == "today":
-                target_date = today
-            elif date_str == "tomorrow":
-                target_date = today + timedelta(days=1)
-            elif date_str.startswith("next ") or date_str in ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]:
-                weekdays = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-                target_day = date_str.replace("next ", "").strip()
-                
-                if target_day in weekdays:
-                    current_weekday = today.weekday()
-                    target_weekday = weekdays.index(target_day)
-                    
-                    days_ahead = target_weekday - current_weekday
-                    if days_ahead <= 0: # Target day already happened this week
-                        days_ahead += 7
-                    if "next " in date_str: 
-                         # Logic: If today is Monday and user says "next Monday", usually means 7 days later.
-                         if days_ahead < 7:
-                             days_ahead += 7
-                    
-                    target_date = today + timedelta(days=days_ahead)
-            
-            if target_date:
-                # Format to YYYY-MM-DD
-                date_str = target_date.strftime("%Y-%m-%d")
-            else:
-                # Try simple parse
-                for fmt in ["%d %B %Y", "%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y"]:
-                    try:
-                        parsed = datetime.strptime(date, fmt)
-                        date_str = parsed.strftime("%Y-%m-%d")
-                        break
-                    except:
-                        continue
-        except Exception as e:
-            logger.warning(f"⚠️ Date parsing warning: {e}")
+    date_str = normalize_date(date)
     
     time_str = time
 
     if not date_str or not time_str:
         return "I need both date and time to book your appointment."
     
+    calendar_manager = await calendar_subsystem.aget()
     if not calendar_manager:
+        tool_errors.inc(tool="booking_agent_tool")
         return "Calendar system is currently offline."
 
     try:
@@ -430,8 +449,10 @@ async def booking_agent_tool(
         is_available = await calendar_manager.is_slot_available(date_str, time_str)
 
         if not is_available:
-            # Get slots (ASYNC)
-            available_slots = await calendar_manager.get_available_slots(date_str)
+            # Get slots (ASYNC), reusing the lookup started right after planning if there was one
+            available_slots = await prefetched(slots_key(date_str))
+            if available_slots is None:
+                available_slots = await calendar_manager.get_available_slots(date_str)
             return (
                 f"{cancel_msg}"
                 f"⛔ The slot **{time_str} on {date_str}** is not available.\n"
@@ -473,4 +494,5 @@ async def booking_agent_tool(
 
     except Exception as e:
         logger.error(f"❌ Error in booking_agent_tool: {e}", exc_info=True)
+        tool_errors.inc(tool="booking_agent_tool")
         return "Something went wrong while booking. Try again."
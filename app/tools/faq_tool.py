@@ -4,12 +4,14 @@ FAQ Agent Tool - Retrieves answers from FAISS vector database
 """
 
 from langchain.tools import tool
-import faiss
 import pickle
+import asyncio
 import random
-from sentence_transformers import SentenceTransformer
 from typing import List, Dict
 import os
+from app.prefetch import prefetched, faq_key
+from app.metrics import track_dependency, tool_errors
+from app.subsystems import register_subsystem
 
 class FAQRetriever:
     """FAISS-based FAQ retrieval system"""
@@ -17,9 +19,8 @@ class FAQRetriever:
     def __init__(self):
         self.faiss_index_path = "vector.faiss"
         self.metadata_path = "vector.pkl"
-        # Initialize lazily to avoid heavy load if not used immediately, 
-        # or handle missing model gracefully. 
-        # For now, following the provided code.
+        # Heavy imports stay out of module import; the retriever itself is built lazily (faq_subsystem)
+        from sentence_transformers import SentenceTransformer
         self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
         self.index = None
         self.metadata = []
@@ -27,6 +28,7 @@ class FAQRetriever:
     
     def _load(self):
         """Load FAISS index and metadata"""
+        import faiss
         try:
             if os.path.exists(self.faiss_index_path):
                 self.index = faiss.read_index(self.faiss_index_path)
@@ -49,17 +51,19 @@ class FAQRetriever:
             return []
         
         # Generate embedding
-        query_embedding = self.embedding_model.encode(
-            [query],
-            normalize_embeddings=True,
-            show_progress_bar=False
-        )
+        with track_dependency("faiss", "encode"):
+            query_embedding = self.embedding_model.encode(
+                [query],
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
         
         # Search FAISS
-        similarities, indices = self.index.search(
-            query_embedding.astype('float32'),
-            top_k
-        )
+        with track_dependency("faiss", "search"):
+            similarities, indices = self.index.search(
+                query_embedding.astype('float32'),
+                top_k
+            )
         
         # Format results
         results = []
@@ -74,6 +78,10 @@ class FAQRetriever:
         
         return results
     
+    async def asearch(self, query: str, top_k: int = 1) -> List[Dict]:
+        """search() off the event loop (embedding + FAISS are CPU-bound)"""
+        return await asyncio.to_thread(self.search, query, top_k)
+    
     def get_random_faqs(self, k: int = 5) -> List[Dict]:
         """Get random FAQ questions"""
         if not self.metadata:
@@ -83,18 +91,12 @@ class FAQRetriever:
         return random.sample(self.metadata, sample_size)
 
 
-# Global FAQ retriever instance
-# We might want to initialize this conditionally or lazily in a real app
-# to prevent startup delay, but sticking to the request.
-try:
-    faq_retriever = FAQRetriever()
-except Exception as e:
-    print(f"Failed to initialize FAQRetriever: {e}")
-    faq_retriever = None
+# Global FAQ retriever, built on first use or by the startup warmup
+faq_subsystem = register_subsystem("faq", FAQRetriever)
 
 
 @tool
-def faq_agent_tool(user_message: str) -> str:
+async def faq_agent_tool(user_message: str) -> str:
     """
     FAQ Agent - Answers informational questions using semantic search.
     
@@ -110,7 +112,9 @@ def faq_agent_tool(user_message: str) -> str:
     Returns:
         Answer from FAQ database or list of common questions
     """
+    faq_retriever = await faq_subsystem.aget()
     if faq_retriever is None:
+        tool_errors.inc(tool="faq_agent_tool")
         return "FAQ system is currently offline."
 
     # Check if user wants to see FAQ list
@@ -131,7 +135,10 @@ def faq_agent_tool(user_message: str) -> str:
     
     else:
         # Search for specific answer
-        results = faq_retriever.search(user_message, top_k=1)
+        # Started right after planning if this was a support step
+        results = await prefetched(faq_key(user_message))
+        if results is None:
+            results = await faq_retriever.asearch(user_message, top_k=1)
         
         if results and results[0]['similarity'] > 0.5:
             result = results[0]
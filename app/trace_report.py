@@ -0,0 +1,166 @@
+"""
+app/trace_report.py
+Reads the JSONL traces written by app/tracing.py and prints where the time went.
+
+    python -m app.trace_report                  # latest trace: flame tree + critical path
+    python -m app.trace_report --last 20        # aggregate flame summary over the last 20 traces
+    python -m app.trace_report --trace <id>     # one specific trace
+
+Rotated files (traces.jsonl.1, .2, ...) are read too, oldest first.
+"""
+
+import argparse
+import json
+import os
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from app.config import Config
+
+BAR_WIDTH = 30
+
+
+def load_traces(path: str) -> Dict[str, List[Dict]]:
+    """trace_id -> spans, in file order (oldest trace first)"""
+    files = [f"{path}.{i}" for i in range(Config.TRACE_BACKUP_COUNT, 0, -1)] + [path]
+    traces: Dict[str, List[Dict]] = {}
+    for file in files:
+        if not os.path.exists(file):
+            continue
+        with open(file) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    span = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                traces.setdefault(span["trace_id"], []).append(span)
+    # Spans of a trace are written when its root ends, so a trace without a root is incomplete
+    return {tid: spans for tid, spans in traces.items() if any(s["parent_id"] is None for s in spans)}
+
+
+def _end(span: Dict) -> float:
+    return span["start"] + span["duration_ms"] / 1000
+
+
+def _children(spans: List[Dict]) -> Dict[str, List[Dict]]:
+    children = defaultdict(list)
+    for span in spans:
+        if span["parent_id"]:
+            children[span["parent_id"]].append(span)
+    for siblings in children.values():
+        siblings.sort(key=lambda s: s["start"])
+    return children
+
+
+def self_time_ms(span: Dict, children: List[Dict]) -> float:
+    """Duration not covered by any child (children may run in parallel, so overlaps count once)"""
+    covered, cursor = 0.0, span["start"]
+    end = _end(span)
+    for child in children:
+        start, stop = max(child["start"], cursor), min(_end(child), end)
+        if stop > start:
+            covered += stop - start
+            cursor = stop
+    return max(span["duration_ms"] - covered * 1000, 0.0)
+
+
+def critical_path(span: Dict, children: Dict[str, List[Dict]]) -> List[Tuple[int, Dict]]:
+    """
+    Chain of spans that determined the end time: walking back from the parent's end,
+    the child that finished last, then the one that finished last before it started, and so on.
+    """
+    path = [(0, span)]
+    cursor = _end(span)
+    chosen = []
+    for child in sorted(children.get(span["span_id"], []), key=_end, reverse=True):
+        if _end(child) <= cursor + 1e-6:
+            chosen.append(child)
+            cursor = child["start"]
+    for child in reversed(chosen):
+        path.extend((depth + 1, s) for depth, s in critical_path(child, children))
+    return path
+
+
+def _label(span: Dict) -> str:
+    attrs = span.get("attributes", {})
+    label = span["name"] if span["kind"] in ("node", "request") else f"{span['kind']}:{span['name']}"
+    if span["kind"] == "llm":
+        label += f" ({attrs.get('prompt_tokens', 0)}+{attrs.get('completion_tokens', 0)} tok)"
+    if span["status"] != "ok":
+        label += f" [{span['status']}]"
+    return label
+
+
+def print_trace(spans: List[Dict]):
+    root = next(s for s in spans if s["parent_id"] is None)
+    children = _children(spans)
+    total = root["duration_ms"] or 1.0
+    attrs = root.get("attributes", {})
+    print(f"\n🧵 Trace {root['trace_id']}  {root['name']}  thread={attrs.get('thread_id', '')}  {root['duration_ms']:.1f} ms")
+
+    print("\n🔥 Flame (offset | duration | span)")
+
+    def walk(span: Dict, depth: int):
+        offset = (span["start"] - root["start"]) * 1000
+        lead = int(offset / total * BAR_WIDTH)
+        width = max(int(span["duration_ms"] / total * BAR_WIDTH), 1)
+        bar = " " * lead + "█" * min(width, BAR_WIDTH - lead)
+        print(f"  {offset:8.1f} {span['duration_ms']:9.1f} ms |{bar:<{BAR_WIDTH}}| {'  ' * depth}{_label(span)}")
+        for child in children.get(span["span_id"], []):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+
+    print("\n🎯 Critical path")
+    for depth, span in critical_path(root, children):
+        own = self_time_ms(span, children.get(span["span_id"], []))
+        print(f"  {span['duration_ms']:9.1f} ms  (self {own:8.1f} ms)  {'  ' * depth}{_label(span)}")
+
+
+def print_summary(traces: List[List[Dict]]):
+    """Self time per span name over several traces: where the time actually goes"""
+    totals: Dict[Tuple[str, str], List[float]] = defaultdict(lambda: [0, 0.0, 0.0])
+    wall = 0.0
+    for spans in traces:
+        children = _children(spans)
+        for span in spans:
+            entry = totals[(span["kind"], span["name"])]
+            entry[0] += 1
+            entry[1] += span["duration_ms"]
+            entry[2] += self_time_ms(span, children.get(span["span_id"], []))
+            if span["parent_id"] is None:
+                wall += span["duration_ms"]
+
+    print(f"\n📊 Flame summary over {len(traces)} traces ({wall:.1f} ms of request time)")
+    print(f"  {'kind':<10} {'span':<28} {'count':>6} {'total ms':>11} {'self ms':>11} {'self %':>7}")
+    for (kind, name), (count, total, own) in sorted(totals.items(), key=lambda item: item[1][2], reverse=True):
+        share = own / wall * 100 if wall else 0.0
+        print(f"  {kind:<10} {name:<28} {count:>6} {total:>11.1f} {own:>11.1f} {share:>6.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Critical-path and flame summaries of recorded traces")
+    parser.add_argument("--file", default=Config.TRACE_FILE, help="trace file (rotated backups are read too)")
+    parser.add_argument("--trace", help="trace id to show")
+    parser.add_argument("--last", type=int, default=1, help="number of most recent traces")
+    args = parser.parse_args()
+
+    traces = load_traces(args.file)
+    if args.trace:
+        selected = [traces[args.trace]] if args.trace in traces else []
+    else:
+        selected = list(traces.values())[-args.last:]
+    if not selected:
+        print(f"No complete traces found in {args.file}")
+        return
+
+    if len(selected) == 1:
+        print_trace(selected[0])
+    print_summary(selected)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+app/tracing.py
+Per-request trace spans exported to a rotating local JSONL file.
+
+Every /chat turn opens a root span; graph nodes, LLM calls, tool invocations and dependency calls
+(Pinecone, Google Calendar, FAISS) become child spans through a context variable, so spans
+opened in LangGraph tasks and asyncio.to_thread workers attach to the right parent.
+When the root span ends, the whole trace is written out, one span per line.
+
+Summaries: python -m app.trace_report
+"""
+
+import json
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+_exporter: Optional[logging.Logger] = None
+
+
+def _get_exporter() -> logging.Logger:
+    """Dedicated logger writing raw JSON lines to TRACE_FILE (rotated by size)"""
+    global _exporter
+    if _exporter is None:
+        exporter = logging.getLogger("app.tracing.export")
+        exporter.propagate = False
+        exporter.setLevel(logging.INFO)
+        handler = RotatingFileHandler(
+            Config.TRACE_FILE, maxBytes=Config.TRACE_MAX_BYTES, backupCount=Config.TRACE_BACKUP_COUNT
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        exporter.addHandler(handler)
+        _exporter = exporter
+    return _exporter
+
+
+class Trace:
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex
+        self.spans: List["Span"] = []
+
+
+class Span:
+    def __init__(self, name: str, kind: str, parent: Optional["Span"] = None, attributes: Optional[Dict] = None):
+        self.trace = parent.trace if parent else Trace()
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.trace.spans.append(self)
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def end(self, status: Optional[str] = None):
+        if self.duration_ms is not None:
+            return
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+        if status:
+            self.status = status
+        if self.parent_id is None:
+            export(self.trace)
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": self.start_time,
+            "duration_ms": round(self.duration_ms, 3) if self.duration_ms is not None else None,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def export(trace: Trace):
+    """Writes every finished span of the trace (spans still running when the request ends are dropped)"""
+    try:
+        exporter = _get_exporter()
+        for span_ in trace.spans:
+            if span_.duration_ms is not None:
+                exporter.info(json.dumps(span_.to_dict(), default=str))
+    except Exception as e:
+        logger.warning(f"⚠️ Trace export failed: {e}")
+
+
+def start_trace(name: str, **attributes) -> Optional[Span]:
+    """Opens the root span of a request and makes it current; the caller ends it"""
+    if not Config.TRACING_ENABLED:
+        return None
+    root = Span(name, "request", attributes=attributes)
+    current_span.set(root)
+    return root
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes):
+    """Child span of the current one; a no-op outside a traced request"""
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+    span_ = Span(name, kind, parent, attributes)
+    token = current_span.set(span_)
+    try:
+        yield span_
+    except BaseException as e:
+        span_.set(error=repr(e))
+        span_.status = "error" if isinstance(e, Exception) else "cancelled"
+        raise
+    finally:
+        current_span.reset(token)
+        span_.end()
+
+
+class TracingCallback(BaseCallbackHandler):
+    """Records every call of the shared LLM as a span, with token counts"""
+
+    run_inline = True
+
+    def __init__(self):
+        self.spans: Dict[UUID, Span] = {}
+
+    def _start(self, run_id: UUID, kwargs: Dict):
+        parent = current_span.get()
+        if parent is None:
+            return
+        params = kwargs.get("invocation_params") or {}
+        model = params.get("model_name") or params.get("model") or "llm"
+        self.spans[run_id] = Span(model, "llm", parent, {"model": model})
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs):
+        self._start(run_id, kwargs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs):
+        self._start(run_id, kwargs)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        span_ = self.spans.pop(run_id, None)
+        if span_ is None:
+            return
+        prompt_tokens = completion_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                prompt_tokens += usage.get("input_tokens", 0)
+                completion_tokens += usage.get("output_tokens", 0)
+        span_.set(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        span_.end()
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs):
+        span_ = self.spans.pop(run_id, None)
+        if span_ is not None:
+            span_.set(error=repr(error))
+            span_.end("error")
+
+
+tracing_callback = TracingCallback()
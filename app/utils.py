@@ -1,14 +1,115 @@
 from langchain_openai import ChatOpenAI
+import httpx
+import logging
 import os
+from typing import Callable, Dict
 from app.config import Config
+from app.llm_cache import llm_cache
+from app.budget import usage_callback
+from app.metrics import metrics_callback
+from app.tracing import tracing_callback
+from app.recording import recorded_chain
 
-def get_llm():
-    api_key = Config.OPENROUTER_API_KEY
-    if not api_key:
-        raise ValueError("OPENROUTER_API_KEY not set in Config")
-    return ChatOpenAI(
-        model="openai/gpt-oss-120b", 
-        temperature=0,
-        api_key=api_key,
-        base_url="https://openrouter.ai/api/v1"
+logger = logging.getLogger(__name__)
+
+# Process-wide LLM client, HTTP pools and prebuilt chains.
+# Built once and shared by every node so requests reuse keep-alive connections
+# instead of paying TLS handshakes and object construction on every hop.
+# cached -> ChatOpenAI
+_llms: Dict[bool, ChatOpenAI] = {}
+_http_client = None
+_http_async_client = None
+_pool_counters = {"requests": 0, "responses": 0}
+
+_chain_builders: Dict[str, Callable] = {}
+_chains: Dict[str, object] = {}
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=Config.LLM_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=Config.LLM_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=Config.LLM_POOL_KEEPALIVE_EXPIRY,
     )
+
+async def _count_request(request):
+    _pool_counters["requests"] += 1
+
+async def _count_response(response):
+    _pool_counters["responses"] += 1
+
+def get_http_clients():
+    """Shared sync/async HTTP clients (one connection pool each)"""
+    global _http_client, _http_async_client
+    if _http_async_client is None:
+        timeout = httpx.Timeout(Config.LLM_TIMEOUT)
+        _http_client = httpx.Client(limits=_pool_limits(), timeout=timeout)
+        _http_async_client = httpx.AsyncClient(
+            limits=_pool_limits(),
+            timeout=timeout,
+            event_hooks={"request": [_count_request], "response": [_count_response]},
+        )
+    return _http_client, _http_async_client
+
+def get_llm(cached: bool = True):
+    """
+    Shared chat model. `cached=False` bypasses the LLM response cache,
+    for calls whose replies must never be reused (e.g. booking, which has side effects).
+    """
+    if cached not in _llms:
+        api_key = Config.OPENROUTER_API_KEY
+        if not api_key:
+            raise ValueError("OPENROUTER_API_KEY not set in Config")
+        http_client, http_async_client = get_http_clients()
+        _llms[cached] = ChatOpenAI(
+            model=Config.LLM_MODEL,
+            temperature=0,
+            api_key=api_key,
+            base_url="https://openrouter.ai/api/v1",
+            http_client=http_client,
+            http_async_client=http_async_client,
+            # False disables caching; None would fall back to a global LangChain cache
+            cache=llm_cache if cached and llm_cache is not None else False,
+            # Counts calls and tokens against the current request's budget
+            # and times it for /metrics
+            callbacks=[usage_callback, metrics_callback, tracing_callback],
+        )
+    return _llms[cached]
+
+def register_chain(name: str, builder: Callable):
+    """Registers a chain builder; the chain itself is built once, on first use or at startup"""
+    _chain_builders[name] = builder
+    # Re-registering (e.g. benchmark stand-ins) replaces a chain that was already built
+    _chains.pop(name, None)
+
+def get_chain(name: str):
+    if name not in _chains:
+        chain = _chain_builders[name]()
+        # Captures each call's output for record / replay of sessions
+        _chains[name] = recorded_chain(name, chain) if Config.RECORDING_ENABLED else chain
+    return _chains[name]
+
+def build_all_chains():
+    """Builds every registered chain up front (called from the API lifespan)"""
+    for name in _chain_builders:
+        get_chain(name)
+    logger.info(f"✅ Prebuilt {len(_chains)} chains: {', '.join(sorted(_chains))}")
+
+def get_pool_stats() -> Dict:
+    """Configured limits, request counters and live connection counts of the async LLM pool"""
+    stats = {
+        "max_connections": Config.LLM_POOL_MAX_CONNECTIONS,
+        "max_keepalive_connections": Config.LLM_POOL_MAX_KEEPALIVE,
+        "keepalive_expiry": Config.LLM_POOL_KEEPALIVE_EXPIRY,
+        **_pool_counters,
+        "open_connections": 0,
+        "idle_connections": 0,
+    }
+    if _http_async_client is not None:
+        try:
+            # httpx does not expose its httpcore pool publicly
+            connections = _http_async_client._transport._pool.connections
+            stats["open_connections"] = len(connections)
+            stats["idle_connections"] = sum(1 for c in connections if c.is_idle())
+        except AttributeError:
+            pass
+    return stats
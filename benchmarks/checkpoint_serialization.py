@@ -0,0 +1,101 @@
+"""
+benchmarks/checkpoint_serialization.py
+Compares full (JsonPlus) vs delta-encoded message checkpoints in SQLiteCheckpointer.
+
+Runs a graph with the DeepAgentState schema but no LLM calls
+(Planner -> Worker -> Reviewer per turn), so it works offline:
+
+    python -m benchmarks.checkpoint_serialization --turns 10 100 500
+
+Reference run (Python 3.11, laptop-class CPU, snapshot interval 50):
+
+     turns format  total write s  stored KiB  cold read ms
+        10   full           0.07       128.5           0.9
+        10  delta           0.05        71.6           1.9
+       100   full           1.01      6900.4           5.2
+       100  delta           0.59       812.2           7.2
+       500   full          13.35    159082.0          20.8
+       500  delta           4.64      6221.6          21.5
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import StateGraph, START, END
+
+from app.checkpoint import SQLiteCheckpointer
+from app.state import DeepAgentState
+
+REPLY = "Here are the available slots for Tuesday: 09:00 AM, 10:15 AM and 02:30 PM. " * 4
+
+
+def build_graph(checkpointer):
+    def planner(state):
+        return {"plan": ["Check availability", "Confirm booking"], "current_step_index": 0,
+                "task_complete": False, "scratchpad": {}}
+
+    def worker(state):
+        return {"messages": [AIMessage(content=REPLY)], "task_complete": True}
+
+    def reviewer(state):
+        return {"current_step_index": state["current_step_index"] + 1}
+
+    builder = StateGraph(DeepAgentState)
+    builder.add_node("Planner", planner)
+    builder.add_node("Worker", worker)
+    builder.add_node("Reviewer", reviewer)
+    builder.add_edge(START, "Planner")
+    builder.add_edge("Planner", "Worker")
+    builder.add_edge("Worker", "Reviewer")
+    builder.add_edge("Reviewer", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def stored_bytes(checkpointer):
+    return checkpointer.conn.execute(
+        "SELECT (SELECT COALESCE(SUM(LENGTH(blob)), 0) FROM blobs)"
+        " + (SELECT COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) FROM checkpoints)"
+        " + (SELECT COALESCE(SUM(LENGTH(blob)), 0) FROM writes)"
+    ).fetchone()[0]
+
+
+async def run(turns: int, delta: bool):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    checkpointer = SQLiteCheckpointer(path, delta_messages=delta)
+    graph = build_graph(checkpointer)
+    config = {"configurable": {"thread_id": "bench"}}
+
+    start = time.perf_counter()
+    for i in range(turns):
+        await graph.ainvoke({"messages": [HumanMessage(content=f"Book me a slot, turn {i}")], "user_id": "u"}, config)
+    write_time = time.perf_counter() - start
+    size = stored_bytes(checkpointer)
+    checkpointer.close()
+
+    # Cold read of the latest state from a fresh process-level instance
+    reader = SQLiteCheckpointer(path, delta_messages=delta)
+    start = time.perf_counter()
+    state = reader.get_tuple(config)
+    read_time = time.perf_counter() - start
+    assert len(state.checkpoint["channel_values"]["messages"]) == turns * 2
+    reader.close()
+    return write_time, size, read_time
+
+
+async def main(turn_counts):
+    print(f"{'turns':>6} {'format':>6} {'total write s':>14} {'stored KiB':>11} {'cold read ms':>13}")
+    for turns in turn_counts:
+        for delta in (False, True):
+            write_time, size, read_time = await run(turns, delta)
+            print(f"{turns:>6} {'delta' if delta else 'full':>6} {write_time:>14.2f} {size / 1024:>11.1f} {read_time * 1000:>13.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 100, 500])
+    args = parser.parse_args()
+    asyncio.run(main(args.turns))
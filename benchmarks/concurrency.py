@@ -0,0 +1,90 @@
+"""
+benchmarks/concurrency.py
+Checks that concurrent /chat turns overlap instead of serializing on the event loop.
+
+Runs the real graph (Planner -> Orchestrator -> Worker -> Reviewer) with the registered
+chains replaced by fakes that sleep for a fixed LLM latency, and memory search stubbed out,
+so it works offline:
+
+    python -m benchmarks.concurrency --requests 1 10 50 --latency 0.5
+
+tests/test_concurrency.py runs the same setup under pytest and fails if 10 requests take
+more than 3x one.
+
+A one-step plan makes two sequential LLM calls (Planner, SupportAgent),
+so one request takes ~2 x latency. With async nodes N requests should take about the same;
+the "overlap" column is N x single-request time / measured time (ideal: N).
+
+Reference run (Python 3.11, latency 0.5 s):
+
+  requests   total s  per-request s  overlap
+         1      1.01           1.01      1.0
+        10      1.06           0.11      9.6
+        50      1.24           0.02     41.1
+"""
+
+import argparse
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+
+import app.agents.planner as planner
+from app.agents.planner import Plan, PlanStep
+from app.config import Config
+from app.graph import create_graph
+from app.memory import memory_subsystem
+from app.utils import register_chain
+
+
+class FakeMemory:
+    async def search_memory(self, user_id, query):
+        return []
+
+
+def fake_chain(output, latency: float):
+    async def call(_):
+        await asyncio.sleep(latency)
+        return output
+    return RunnableLambda(call)
+
+
+def install_fakes(latency: float):
+    plan = Plan(steps=[PlanStep(description="Answer the pricing question", worker="SupportAgent")])
+    register_chain("planner", lambda: fake_chain(plan, latency))
+    register_chain("summary", lambda: fake_chain(AIMessage(content="summary"), latency))
+    for worker in ("booking", "support", "crisis"):
+        register_chain(worker, lambda: fake_chain(AIMessage(content="Pricing starts at $99."), latency))
+    memory_subsystem.override(FakeMemory())
+    # Every request sends the same message; measure LLM overlap, not plan cache hits or coalescing
+    planner.plan_cache = None
+    Config.BATCH_ENABLED = False
+
+
+async def run(graph, requests: int) -> float:
+    async def one(i):
+        config = {"configurable": {"thread_id": f"bench-{requests}-{i}"}}
+        await graph.ainvoke({"messages": [HumanMessage(content="How much does it cost?")], "user_id": f"u{i}"}, config)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return time.perf_counter() - start
+
+
+async def main(request_counts, latency: float):
+    install_fakes(latency)
+    graph = create_graph()
+    single = await run(graph, 1)
+    print(f"{'requests':>9} {'total s':>9} {'per-request s':>14} {'overlap':>8}")
+    for requests in request_counts:
+        total = await run(graph, requests)
+        print(f"{requests:>9} {total:>9.2f} {total / requests:>14.2f} {requests * single / total:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated seconds per LLM call")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.latency))
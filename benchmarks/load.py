@@ -0,0 +1,171 @@
+"""
+benchmarks/load.py
+End-to-end load benchmark of the /chat API, offline.
+
+Starts the FastAPI app in-process (lifespan included) with the stand-ins from benchmarks/standins.py
+(scripted LLM, fake memory, calendar and FAQ index, each with a simulated latency), then drives
+/chat with multi-turn conversations at each concurrency level: every virtual user runs
+conversations back to back, one turn at a time, each conversation on a new thread.
+
+    python -m benchmarks.load --concurrency 1 10 50 --conversations 100 --llm-latency 0.3
+
+Reports throughput, turn latency percentiles and the share of graph-node time spent per node
+(from the metrics registry, so it matches what /metrics shows in production).
+Features are toggled with the usual environment variables (PLAN_CACHE_ENABLED, BATCH_ENABLED, ...).
+
+Reference run (Python 3.11, defaults: LLM 0.3 s, dependencies 0.05 s, 50 conversations = 90 turns):
+
+   conc  turns  errors  turns/s   p50 ms   p95 ms   p99 ms
+      1     90       0      1.6      722      894      912
+     10     90       0     10.8      780      915      950
+     50     90       0     29.5      880     1282     1504
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import time
+import uuid
+from typing import Dict, List
+
+import httpx
+
+from app.config import Config
+
+# Each conversation is a list of user turns
+SCRIPTS: List[List[str]] = [
+    ["How much does the Pro plan cost?"],
+    ["I'd like to book a demo tomorrow",
+     "10:00 AM works. I'm Jane Doe from Acme, jane@acme.com, 555-0100"],
+    ["What are your support hours? Also book me a call next monday at 2:00 PM, I'm Bob Stone from Initech, bob@initech.com"],
+    ["Do you offer refunds?",
+     "This is unacceptable, I want to talk to a manager"],
+    ["Can I schedule a meeting?",
+     "Friday at 11:30 AM please",
+     "Sorry, my email is sam@globex.com. I'm Sam Lee from Globex"],
+]
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(int(round(p / 100 * len(ordered))) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def node_seconds() -> Dict[str, float]:
+    """Total time recorded per graph node so far"""
+    from app.metrics import node_latency
+    with node_latency.lock:
+        return {key[0]: entry[1] for key, entry in node_latency.values.items()}
+
+
+def dependency_seconds() -> Dict[str, float]:
+    from app.metrics import dependency_latency
+    totals: Dict[str, float] = {}
+    with dependency_latency.lock:
+        for (dependency, _), entry in dependency_latency.values.items():
+            totals[dependency] = totals.get(dependency, 0.0) + entry[1]
+    return totals
+
+
+async def run_level(client: httpx.AsyncClient, concurrency: int, conversations: int) -> Dict:
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    queue: asyncio.Queue = asyncio.Queue()
+    for index in range(conversations):
+        queue.put_nowait(SCRIPTS[index % len(SCRIPTS)])
+
+    async def virtual_user(user: int):
+        while not queue.empty():
+            script = queue.get_nowait()
+            thread_id = f"load-{uuid.uuid4().hex[:8]}"
+            for message in script:
+                started = time.perf_counter()
+                try:
+                    response = await client.post("/chat", json={"message": message, "thread_id": thread_id, "user_id": f"user-{user}"})
+                    status = str(response.status_code)
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                latencies.append(time.perf_counter() - started)
+                if status != "200":
+                    errors[status] = errors.get(status, 0) + 1
+                    break
+
+    nodes_before, deps_before = node_seconds(), dependency_seconds()
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_user(user) for user in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    nodes_after, deps_after = node_seconds(), dependency_seconds()
+
+    return {
+        "concurrency": concurrency,
+        "turns": len(latencies),
+        "errors": errors,
+        "elapsed": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "nodes": {name: nodes_after[name] - nodes_before.get(name, 0.0) for name in nodes_after},
+        "dependencies": {name: deps_after[name] - deps_before.get(name, 0.0) for name in deps_after},
+    }
+
+
+def print_report(results: List[Dict]):
+    print(f"\n{'conc':>5} {'turns':>6} {'errors':>7} {'turns/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for r in results:
+        print(f"{r['concurrency']:>5} {r['turns']:>6} {sum(r['errors'].values()):>7} {r['throughput']:>8.1f} "
+              f"{r['p50'] * 1000:>8.0f} {r['p95'] * 1000:>8.0f} {r['p99'] * 1000:>8.0f}")
+
+    for r in results:
+        total = sum(r["nodes"].values()) or 1.0
+        shares = ", ".join(f"{name} {seconds / total:.0%}" for name, seconds in
+                           sorted(r["nodes"].items(), key=lambda item: item[1], reverse=True) if seconds > 0)
+        deps = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in sorted(r["dependencies"].items()) if seconds > 0)
+        print(f"\nconcurrency {r['concurrency']}: node time share: {shares}")
+        if deps:
+            print(f"  dependency time: {deps}")
+        if r["errors"]:
+            print(f"  errors: {r['errors']}")
+
+
+async def main(args):
+    from benchmarks.standins import install_standins
+    install_standins(args.llm_latency, args.dependency_latency, args.jitter, args.seed)
+    import app.main as api
+
+    results = []
+    async with api.app.router.lifespan_context(api.app):
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+            # One conversation of each script first, so one-off initialization is not measured
+            await run_level(client, 1, len(SCRIPTS))
+            for concurrency in args.concurrency:
+                result = await run_level(client, concurrency, args.conversations)
+                results.append(result)
+                print(f"✅ concurrency {concurrency}: {result['turns']} turns in {result['elapsed']:.2f}s", file=sys.stderr)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline end-to-end load benchmark of /chat")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50], help="Virtual users per level")
+    parser.add_argument("--conversations", type=int, default=50, help="Conversations per level")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Simulated seconds per LLM call")
+    parser.add_argument("--dependency-latency", type=float, default=0.05, help="Simulated seconds per Pinecone / calendar call")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latency jitter, as a fraction of the base latency")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=120.0, help="Client timeout per turn, seconds")
+    parser.add_argument("--verbose", action="store_true", help="Show the app's own output")
+    parser.add_argument("--trace", action="store_true", help="Also write traces of the run to TRACE_FILE")
+    args = parser.parse_args()
+    Config.TRACING_ENABLED = args.trace
+    # The nodes print their progress; keep it out of the report unless asked for
+    with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w")):
+        results = asyncio.run(main(args))
+    print_report(results)
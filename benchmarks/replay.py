@@ -0,0 +1,187 @@
+"""
+benchmarks/replay.py
+Replays recorded /chat sessions through create_graph() and flags regressions.
+
+Record production traffic with RECORDING_ENABLED=true (sessions land in RECORDING_DIR), then:
+
+    python -m benchmarks.replay recordings/ --save baseline.json
+    # ... change the code ...
+    python -m benchmarks.replay recordings/ --baseline baseline.json
+
+Every LLM call and tool call is answered from the recording (no network), turns of a session
+run in order on a fresh thread, one at a time so CPU time is attributable. For each turn the
+replay is compared with the recording and, with --baseline, with an earlier replay:
+
+- more runs of a node than recorded (an extra Orchestrator loop, a repeated worker)
+- more LLM or tool calls, or more Reviewer retries
+- calls the recording cannot answer, or recorded calls never made (the run diverged)
+- a different final response
+- local CPU time above the baseline by more than --cpu-tolerance (and --cpu-floor-ms)
+
+Exits with status 1 when anything is flagged. Sessions should be recorded from their first turn,
+since a replay starts with an empty thread.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import glob
+import json
+import os
+import sys
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List
+
+from langchain_core.messages import HumanMessage
+
+from app.config import Config
+
+CHAINS = ("planner", "summary", "booking", "support", "crisis")
+
+
+def load_sessions(path: str) -> Dict[str, List[Dict]]:
+    """session name -> recorded turns, in order"""
+    files = [path] if os.path.isfile(path) else sorted(glob.glob(os.path.join(path, "*.jsonl")))
+    sessions = {}
+    for file in files:
+        with open(file) as f:
+            turns = [json.loads(line) for line in f if line.strip()]
+        if turns:
+            sessions[os.path.splitext(os.path.basename(file))[0]] = sorted(turns, key=lambda t: t["recorded_at"])
+    return sessions
+
+
+def install_replay():
+    """Deterministic runs: recorded chains, no caches / batching / prefetch, memory stubbed out"""
+    import app.agents.planner as planner
+    import app.graph  # noqa: F401  (registers the real chains, replaced below)
+    from app.memory import memory_subsystem
+    from app.recording import replay_chain
+    from app.utils import register_chain
+    from benchmarks.standins import FakeMemory
+
+    Config.RECORDING_ENABLED = False
+    Config.TRACING_ENABLED = False
+    Config.BATCH_ENABLED = False
+    Config.PREFETCH_ENABLED = False
+    planner.plan_cache = None
+    memory_subsystem.override(FakeMemory())
+    for name in CHAINS:
+        register_chain(name, lambda name=name: replay_chain(name))
+
+
+def compare(turn: Dict, replay, final_state: Dict, cpu_ms: float, baseline: Dict, cpu_tolerance: float, cpu_floor_ms: float) -> List[str]:
+    flags = list(dict.fromkeys(replay.divergences))
+    recorded_nodes, replayed_nodes = Counter(turn.get("nodes", [])), Counter(replay.nodes)
+    for node in sorted(set(recorded_nodes) | set(replayed_nodes)):
+        if replayed_nodes[node] > recorded_nodes[node]:
+            flags.append(f"{node} ran {replayed_nodes[node]}x (recorded {recorded_nodes[node]}x)")
+    if replay.llm_calls > len(turn.get("llm_calls", [])):
+        flags.append(f"{replay.llm_calls} LLM calls (recorded {len(turn.get('llm_calls', []))})")
+    if replay.tool_calls > len(turn.get("tool_calls", [])):
+        flags.append(f"{replay.tool_calls} tool calls (recorded {len(turn.get('tool_calls', []))})")
+    retries = sum((final_state.get('step_retries') or {}).values())
+    if retries > turn.get("retries", 0):
+        flags.append(f"{retries} retries (recorded {turn.get('retries', 0)})")
+    unused = replay.unused()
+    if unused:
+        flags.append(f"recorded calls not made: {', '.join(unused)}")
+    messages = final_state.get('messages') or []
+    if "response" in turn and messages and messages[-1].content != turn["response"]:
+        flags.append("final response changed")
+    if baseline and cpu_ms > baseline["cpu_ms"] * (1 + cpu_tolerance) and cpu_ms - baseline["cpu_ms"] > cpu_floor_ms:
+        flags.append(f"CPU {cpu_ms:.1f} ms (baseline {baseline['cpu_ms']:.1f} ms)")
+    return flags
+
+
+async def replay_sessions(sessions: Dict[str, List[Dict]], baseline: Dict, cpu_tolerance: float, cpu_floor_ms: float) -> List[Dict]:
+    from app.budget import start_budget
+    from app.graph import create_graph
+    from app.recording import start_replay
+
+    graph = create_graph()
+    # Unmeasured pass over the first session, so one-off imports and warm-up are not charged to a turn
+    first = next(iter(sessions.values()))
+    warmup = {"configurable": {"thread_id": f"replay-warmup-{uuid.uuid4().hex[:8]}"}}
+    for turn in first:
+        start_replay(turn)
+        try:
+            await graph.ainvoke({"messages": [HumanMessage(content=turn["message"])], "user_id": turn["user_id"]}, config=warmup)
+        except Exception:
+            break
+    results = []
+    for name, turns in sessions.items():
+        config = {"configurable": {"thread_id": f"replay-{name}-{uuid.uuid4().hex[:8]}"}}
+        for index, turn in enumerate(turns):
+            start_budget()
+            replay = start_replay(turn)
+            cpu_start, wall_start = time.process_time(), time.perf_counter()
+            error = None
+            final_state: Dict = {}
+            try:
+                final_state = await graph.ainvoke(
+                    {"messages": [HumanMessage(content=turn["message"])], "user_id": turn["user_id"]}, config=config)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            cpu_ms = (time.process_time() - cpu_start) * 1000
+            key = f"{name}#{index}"
+            flags = compare(turn, replay, final_state, cpu_ms, baseline.get(key), cpu_tolerance, cpu_floor_ms)
+            if error:
+                flags.append(f"failed: {error}")
+            results.append({
+                "turn": key,
+                "nodes": len(replay.nodes),
+                "llm_calls": replay.llm_calls,
+                "tool_calls": replay.tool_calls,
+                "cpu_ms": round(cpu_ms, 3),
+                "wall_ms": round((time.perf_counter() - wall_start) * 1000, 3),
+                "flags": flags,
+            })
+    return results
+
+
+def print_report(results: List[Dict]):
+    print(f"\n{'turn':<40} {'nodes':>6} {'llm':>4} {'tools':>6} {'cpu ms':>8}  flags")
+    for r in results:
+        flags = "; ".join(r["flags"]) or "ok"
+        print(f"{r['turn']:<40} {r['nodes']:>6} {r['llm_calls']:>4} {r['tool_calls']:>6} {r['cpu_ms']:>8.1f}  {flags}")
+    flagged = sum(1 for r in results if r["flags"])
+    cpu = sum(r["cpu_ms"] for r in results)
+    print(f"\n{len(results)} turns replayed, {flagged} flagged, {cpu:.1f} ms CPU total")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded /chat sessions and flag regressions")
+    parser.add_argument("path", nargs="?", default=Config.RECORDING_DIR, help="recording directory or session file")
+    parser.add_argument("--baseline", help="replay report to compare CPU time against")
+    parser.add_argument("--save", help="write this replay's report (usable as a later --baseline)")
+    parser.add_argument("--cpu-tolerance", type=float, default=0.25, help="allowed CPU increase over the baseline (fraction)")
+    parser.add_argument("--cpu-floor-ms", type=float, default=5.0, help="CPU increases smaller than this are noise")
+    parser.add_argument("--verbose", action="store_true", help="Show the app's own output")
+    args = parser.parse_args()
+
+    sessions = load_sessions(args.path)
+    if not sessions:
+        print(f"No recorded sessions in {args.path}")
+        return 0
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {r["turn"]: r for r in json.load(f)}
+
+    install_replay()
+    # The nodes print their progress; keep it out of the report unless asked for
+    with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w")):
+        results = asyncio.run(replay_sessions(sessions, baseline, args.cpu_tolerance, args.cpu_floor_ms))
+
+    print_report(results)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    return 1 if any(r["flags"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
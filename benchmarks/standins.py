@@ -0,0 +1,228 @@
+"""
+benchmarks/standins.py
+Deterministic local stand-ins for OpenRouter, Pinecone, Google Calendar and the FAQ index.
+
+- ScriptedLLM replaces every registered chain: the Planner's structured plans and the
+  workers' tool calls are derived from the conversation with simple rules, after a simulated latency.
+- FakeMemory, FakeCalendar and FakeFAQ mirror the interfaces the app uses, with their own latency,
+  and record their calls through track_dependency like the real clients.
+
+Latencies are drawn from a seeded RNG, so two runs with the same settings do the same work.
+
+    from benchmarks.standins import install_standins
+    install_standins(llm_latency=0.3, dependency_latency=0.05)
+"""
+
+import asyncio
+import random
+import re
+import time
+from typing import Dict, List, Optional
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+
+from app.metrics import track_dependency
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+TIME_PATTERN = re.compile(r"\b(\d{1,2}:\d{2} ?[AP]M)\b", re.IGNORECASE)
+PHONE_PATTERN = re.compile(r"\b\d{3}-\d{4}\b")
+NAME_PATTERN = re.compile(r"\b(?:I'm|I am|my name is) ([A-Z][a-z]+(?: [A-Z][a-z]+)?)")
+COMPANY_PATTERN = re.compile(r"\bfrom ([A-Z][\w&]+)")
+
+# Planner rules, in plan order: (pattern on the user message, step description, worker)
+PLAN_RULES = [
+    (re.compile(r"human|manager|frustrat|angry|unacceptable|complain", re.IGNORECASE),
+     "Escalate the conversation to a human agent", "CrisisAgent"),
+    (re.compile(r"price|pricing|cost|hours|feature|support|refund|how|what", re.IGNORECASE),
+     "Answer the user's question from the FAQ", "SupportAgent"),
+    (re.compile(r"book|schedule|meeting|demo|call|appointment|reschedul|@|\d:\d{2}", re.IGNORECASE),
+     "Book the meeting the user asked for", "BookingAgent"),
+]
+
+SLOTS = ["09:00 AM - 09:30 AM", "10:30 AM - 11:00 AM", "01:00 PM - 01:30 PM", "03:30 PM - 04:00 PM"]
+
+
+class Latency:
+    """Seeded latency source: base seconds +/- jitter (a fraction of base)"""
+
+    def __init__(self, base: float, jitter: float = 0.2, seed: int = 7):
+        self.base = base
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+
+    def sample(self) -> float:
+        return max(self.base * (1 + self.rng.uniform(-self.jitter, self.jitter)), 0.0)
+
+    async def wait(self):
+        await asyncio.sleep(self.sample())
+
+
+def _user_turns(messages: List) -> List[str]:
+    return [m.content for m in messages if isinstance(m, HumanMessage)]
+
+
+class ScriptedLLM:
+    """Rule-based replacement for every registered chain"""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self.calls: Dict[str, int] = {}
+
+    def _count(self, name: str):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def chain(self, name: str):
+        handler = getattr(self, name, None) or (lambda inputs: self.worker(name, inputs))
+
+        async def call(inputs):
+            self._count(name)
+            await self.latency.wait()
+            return handler(inputs)
+        return RunnableLambda(call)
+
+    def planner(self, inputs: Dict):
+        from app.agents.planner import Plan, PlanStep
+        message = inputs["input"]
+        steps = [PlanStep(description=description, worker=worker)
+                 for pattern, description, worker in PLAN_RULES if pattern.search(message)]
+        return Plan(steps=steps or [PlanStep(description=PLAN_RULES[1][1], worker="SupportAgent")])
+
+    def summary(self, inputs: Dict) -> AIMessage:
+        return AIMessage(content=f"Summary so far: {inputs['transcript'][-200:]}")
+
+    def worker(self, name: str, messages: List) -> AIMessage:
+        turns = _user_turns(messages)
+        last = turns[-1] if turns else ""
+        if name == "support":
+            return _tool_call("faq_agent_tool", {"user_message": last})
+        if name == "crisis":
+            return _tool_call("human_handoff_tool", {
+                "issue_summary": last[:120], "severity": "High", "user_emotion": "Frustrated"})
+        return self._booking(turns)
+
+    def _booking(self, turns: List[str]) -> AIMessage:
+        from app.prefetch import DATE_PATTERN
+        text = " ".join(turns)
+        date, time_, email = DATE_PATTERN.search(text), TIME_PATTERN.search(text), EMAIL_PATTERN.search(text)
+        if not (date and time_ and email):
+            return AIMessage(content="Sure! Which date and time (9 AM - 5 PM) work for you, and what email should I use?")
+        name, phone, company = NAME_PATTERN.search(text), PHONE_PATTERN.search(text), COMPANY_PATTERN.search(text)
+        return _tool_call("booking_agent_tool", {
+            "date": date.group(1),
+            "time": time_.group(1).upper(),
+            "email": email.group(0),
+            "name": name.group(1) if name else "Guest",
+            "contact": phone.group(0) if phone else "n/a",
+            "company_name": company.group(1) if company else "n/a",
+            "reason": "Product demo",
+            "reschedule": "reschedul" in text.lower(),
+        })
+
+
+def _tool_call(name: str, args: Dict) -> AIMessage:
+    return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call_{name}"}])
+
+
+class FakeMemory:
+    """PineconeMemory stand-in: keeps memories per user in a dict"""
+
+    store: Dict[str, List[str]] = {}
+    latency = Latency(0.0)
+
+    async def add_memory(self, user_id: str, text: str):
+        with track_dependency("pinecone", "upsert"):
+            await self.latency.wait()
+        self.store.setdefault(user_id, []).append(text)
+
+    async def add_memories(self, records: List[Dict]):
+        with track_dependency("pinecone", "upsert"):
+            await self.latency.wait()
+        for record in records:
+            self.store.setdefault(record["user_id"], []).append(record["text"])
+
+    async def search_memory(self, user_id: str, query: str, top_k: int = 3) -> List[str]:
+        with track_dependency("pinecone", "search"):
+            await self.latency.wait()
+        return self.store.get(user_id, [])[-top_k:]
+
+    async def close(self):
+        pass
+
+
+class FakeCalendar:
+    """GoogleCalendarManager stand-in; a slot is busy for a fixed, hash-derived subset of times"""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self.service = True  # prefetch only runs against a connected calendar
+        self.bookings: List[Dict] = []
+
+    async def is_slot_available(self, date_str: str, time_str: str) -> bool:
+        with track_dependency("calendar", "is_slot_available"):
+            await self.latency.wait()
+        return sum(map(ord, date_str + time_str)) % 4 != 0
+
+    async def get_available_slots(self, date_str: str) -> List[str]:
+        with track_dependency("calendar", "get_available_slots"):
+            await self.latency.wait()
+        return list(SLOTS)
+
+    async def book_meeting(self, user_email: str, date_str: str, slot: str, meeting_title: str) -> Dict:
+        with track_dependency("calendar", "book_meeting"):
+            await self.latency.wait()
+        booking = {"date": date_str, "slot": slot, "meet_link": f"https://meet.example.com/{len(self.bookings):05d}"}
+        self.bookings.append(booking)
+        return booking
+
+    async def cancel_meeting(self, user_email: str, reason: str) -> Optional[str]:
+        with track_dependency("calendar", "cancel_meeting"):
+            await self.latency.wait()
+        return f"{reason} with {user_email}"
+
+
+class FakeFAQ:
+    """FAQRetriever stand-in (no embedding model, so the semantic LLM cache stays off)"""
+
+    embedding_model = None
+    entries = [
+        {"question": "How much does the Pro plan cost?", "answer": "The Pro plan is $99 per seat per month."},
+        {"question": "What are your support hours?", "answer": "Support is available 24/7 by chat and email."},
+        {"question": "Do you offer refunds?", "answer": "Yes, within 30 days of purchase."},
+    ]
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+
+    def search(self, query: str, top_k: int = 1) -> List[Dict]:
+        with track_dependency("faiss", "search"):
+            time.sleep(self.latency.sample())
+        words = set(query.lower().split())
+        ranked = sorted(self.entries, key=lambda e: len(words & set(e["question"].lower().split())), reverse=True)
+        return [{**entry, "similarity": 0.9} for entry in ranked[:top_k]]
+
+    async def asearch(self, query: str, top_k: int = 1) -> List[Dict]:
+        return await asyncio.to_thread(self.search, query, top_k)
+
+    def get_random_faqs(self, k: int = 5) -> List[Dict]:
+        return self.entries[:k]
+
+
+def install_standins(llm_latency: float = 0.3, dependency_latency: float = 0.05, jitter: float = 0.2, seed: int = 7) -> ScriptedLLM:
+    """Swaps the LLM chains, memory, calendar and FAQ index for the stand-ins (call before the app starts)"""
+    import app.main  # noqa: F401  (registers the real chains, replaced below)
+    from app.memory import memory_subsystem
+    from app.tools.booking_tool import calendar_subsystem
+    from app.tools.faq_tool import faq_subsystem
+    from app.utils import register_chain
+
+    llm = ScriptedLLM(Latency(llm_latency, jitter, seed))
+    for name in ("planner", "summary", "booking", "support", "crisis"):
+        register_chain(name, lambda name=name: llm.chain(name))
+
+    FakeMemory.latency = Latency(dependency_latency, jitter, seed + 1)
+    FakeMemory.store = {}
+    memory_subsystem.override(FakeMemory())
+    calendar_subsystem.override(FakeCalendar(Latency(dependency_latency, jitter, seed + 2)))
+    faq_subsystem.override(FakeFAQ(Latency(dependency_latency / 5, jitter, seed + 3)))
+    return llm
@@ -0,0 +1,100 @@
+"""
+benchmarks/startup.py
+Import-time profile and time-to-ready of the API.
+
+    python -m benchmarks.startup --top 15
+
+1. Imports app.main in a fresh interpreter with -X importtime and lists its slowest
+   direct imports (cumulative), plus the total import wall time.
+2. Checks that the heavy SDKs (sentence_transformers, faiss, pinecone, Google API client)
+   are not imported by app.main.
+3. Runs the lifespan in-process and polls /ready until the warmup has settled, reporting
+   each subsystem's state and load time.
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+HEAVY_MODULES = ("sentence_transformers", "faiss", "torch", "pinecone", "googleapiclient", "google_auth_oauthlib")
+
+
+def import_profile() -> Tuple[float, List[Tuple[int, int, str]]]:
+    """Wall seconds to import app.main, and (self us, cumulative us, module) per import"""
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"],
+                            capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append((int(self_us), int(cumulative_us), name.rstrip()))
+    if result.returncode:
+        print(f"⚠️ import app.main failed:\n{result.stderr.splitlines()[-1] if result.stderr else ''}")
+    return elapsed, entries
+
+
+def loaded_heavy_modules() -> List[str]:
+    code = "import sys, app.main; print(','.join(sorted({m.split('.')[0] for m in sys.modules})))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    loaded = set(result.stdout.strip().splitlines()[-1].split(",")) if result.stdout.strip() else set()
+    return [name for name in HEAVY_MODULES if name in loaded]
+
+
+async def time_to_ready(timeout: float) -> Tuple[float, Dict]:
+    import httpx
+    import app.main as api
+
+    started = time.perf_counter()
+    async with api.app.router.lifespan_context(api.app):
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            while True:
+                response = await client.get("/ready")
+                if response.status_code == 200 or time.perf_counter() - started > timeout:
+                    return time.perf_counter() - started, response.json()
+                await asyncio.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile and time-to-ready of the API")
+    parser.add_argument("--top", type=int, default=15, help="Slowest direct imports of app.main to list")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds to wait for /ready")
+    args = parser.parse_args()
+
+    elapsed, entries = import_profile()
+    # -X importtime indents each nesting level by two spaces (after one separator space)
+    def depth(name: str) -> int:
+        return (len(name) - len(name.lstrip()) - 1) // 2
+
+    # Direct imports of app.main: children are listed before their parent
+    direct, children = [], []
+    for entry in entries:
+        if depth(entry[2]) == 1:
+            children.append(entry)
+        elif depth(entry[2]) == 0:
+            if entry[2].strip() == "app.main":
+                direct = sorted(children, key=lambda e: e[1], reverse=True)
+            children = []
+    print(f"📦 import app.main: {elapsed:.2f}s wall (interpreter start included)")
+    print(f"  {'cumulative ms':>14} {'self ms':>9}  module (first import of a package counts its dependencies)")
+    for self_us, cumulative_us, name in direct[:args.top]:
+        print(f"  {cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name.strip()}")
+
+    heavy = loaded_heavy_modules()
+    print(f"\n🪶 Heavy SDKs imported by app.main: {', '.join(heavy) if heavy else 'none'}")
+
+    ready_seconds, status = asyncio.run(time_to_ready(args.timeout))
+    print(f"\n🔥 /ready {'ready' if status['ready'] else 'NOT ready'} after {ready_seconds:.2f}s")
+    for name, subsystem in status["subsystems"].items():
+        error = f"  ({subsystem['error']})" if subsystem["error"] else ""
+        print(f"  {name:<10} {subsystem['state']:<8} {subsystem['load_seconds'] or 0:>7.2f}s{error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+tests/test_checkpoint.py
+Message deltas in a SQLite file shared by several worker processes (one checkpointer each),
+and task writes buffered from the event loop without taking the checkpointer's lock.
+"""
+
+import asyncio
+import threading
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.base import empty_checkpoint
+
+from app.checkpoint import MESSAGES_SNAPSHOT, SQLiteCheckpointer
+
+LOCK_HELD = 1.0  # seconds
+
+
+def turn(i: int):
+    return [HumanMessage(content=f"question {i}"), AIMessage(content=f"answer {i}")]
+
+
+def put_messages(saver, config, messages, previous_version=None):
+    """Writes a checkpoint holding `messages` after the one `config` points at"""
+    version = saver.get_next_version(previous_version, None)
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_versions"] = {"messages": version}
+    checkpoint["channel_values"] = {"messages": messages}
+    return saver.put(config, checkpoint, {}, {"messages": version}), version
+
+
+def test_delta_base_comes_from_the_parent_checkpoint(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+    worker_a, worker_b = SQLiteCheckpointer(path), SQLiteCheckpointer(path)
+    config = {"configurable": {"thread_id": "t", "checkpoint_ns": ""}}
+
+    config, version = put_messages(worker_a, config, turn(0))
+    config, version = put_messages(worker_a, config, turn(0) + turn(1), version)
+    # The thread's next turn lands on the other worker, whose trim drops worker_a's last version
+    config, version = put_messages(worker_b, config, turn(0) + turn(1) + turn(2), version)
+    worker_b.trim(keep_last=1)
+    config, version = put_messages(worker_a, config, turn(0) + turn(1) + turn(2) + turn(3), version)
+
+    fresh = SQLiteCheckpointer(path)
+    # Every surviving checkpoint decodes (no delta points at a deleted base)
+    assert len(list(fresh.list(None))) == 2
+    assert [m.content for m in fresh.get_tuple(config).checkpoint["channel_values"]["messages"]] == [
+        m.content for i in range(4) for m in turn(i)
+    ]
+
+
+def test_missing_base_writes_a_snapshot(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+    worker_a, worker_b = SQLiteCheckpointer(path), SQLiteCheckpointer(path)
+    config = {"configurable": {"thread_id": "t", "checkpoint_ns": ""}}
+
+    config, version = put_messages(worker_a, config, turn(0))
+    # Another process deletes the parent's blob between worker_a's writes
+    worker_b.conn.execute("DELETE FROM blobs WHERE version = ?", (version,))
+    config, next_version = put_messages(worker_a, config, turn(0) + turn(1), version)
+
+    blob_type = worker_a.conn.execute("SELECT type FROM blobs WHERE version = ?", (next_version,)).fetchone()[0]
+    assert blob_type == MESSAGES_SNAPSHOT
+    assert len(SQLiteCheckpointer(path).get_tuple(config).checkpoint["channel_values"]["messages"]) == 4
+
+
+def test_buffered_writes_dont_wait_for_the_lock(tmp_path):
+    saver = SQLiteCheckpointer(str(tmp_path / "checkpoints.db"))
+    config, _ = put_messages(saver, {"configurable": {"thread_id": "t", "checkpoint_ns": ""}}, turn(0))
+
+    # As if a trim or eviction pass held the lock in a worker thread
+    locked = threading.Event()
+
+    def hold_lock():
+        with saver.lock:
+            locked.set()
+            time.sleep(LOCK_HELD)
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    locked.wait()
+    started = time.perf_counter()
+    asyncio.run(saver.aput_writes(config, [("messages", turn(1))], "task"))
+    elapsed = time.perf_counter() - started
+    holder.join()
+
+    assert elapsed < LOCK_HELD / 2
+    assert len(saver.get_tuple(config).pending_writes) == 1
@@ -0,0 +1,30 @@
+"""
+tests/test_concurrency.py
+Concurrent /chat turns must overlap on the event loop instead of serializing.
+
+Uses the stand-in chains of benchmarks/concurrency.py (fixed LLM latency, no network).
+"""
+
+import asyncio
+
+from app.graph import create_graph
+from benchmarks.concurrency import install_fakes, run
+
+LATENCY = 0.2  # seconds per simulated LLM call
+REQUESTS = 10
+# Serialized, 10 requests take ~10x one; overlapped they stay close to 1x
+MAX_SLOWDOWN = 3
+
+
+def test_concurrent_requests_take_about_as_long_as_one():
+    async def measure():
+        install_fakes(LATENCY)
+        graph = create_graph()
+        # Unmeasured first run: imports and chain builds are not charged to the single request
+        await run(graph, 1)
+        single = await run(graph, 1)
+        return single, await run(graph, REQUESTS)
+
+    single, concurrent = asyncio.run(measure())
+    assert concurrent < MAX_SLOWDOWN * single, (
+        f"{REQUESTS} concurrent requests took {concurrent:.2f}s, one took {single:.2f}s")
@@ -0,0 +1,69 @@
+"""
+tests/test_context.py
+Background summary updates: they land on the thread's next turn, and until one succeeds the
+messages it would cover stay in the workers' context.
+"""
+
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+
+import app.context as context_module
+from app.context import build_context, collect_summary_update, start_summary_update
+
+RECENT_TURNS = context_module.Config.CONTEXT_RECENT_TURNS
+
+
+def conversation(turns: int):
+    messages = []
+    for i in range(turns):
+        messages += [HumanMessage(content=f"question {i}"), AIMessage(content=f"answer {i}")]
+    return {"messages": messages, "user_id": "u"}
+
+
+def summary_chain(monkeypatch, reply):
+    async def call(inputs):
+        if isinstance(reply, Exception):
+            raise reply
+        return AIMessage(content=reply)
+    monkeypatch.setattr(context_module, "get_chain", lambda name: RunnableLambda(call))
+
+
+def test_failed_summary_keeps_messages_in_context(monkeypatch):
+    summary_chain(monkeypatch, RuntimeError("summary LLM down"))
+    state = conversation(RECENT_TURNS + 2)
+
+    async def turn():
+        start_summary_update("failing", state)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        return collect_summary_update("failing", state)
+
+    assert asyncio.run(turn()) == {}
+    contents = [m.content for m in build_context(state, "SYS") if not isinstance(m, tuple)]
+    assert contents[:2] == ["question 0", "answer 0"]
+
+
+def test_summary_lands_on_the_next_turn_only_on_its_base(monkeypatch):
+    summary_chain(monkeypatch, "the user asked questions")
+    state = conversation(RECENT_TURNS + 2)
+
+    async def turns():
+        start_summary_update("thread", state)
+        # Still running: the turn that started it doesn't wait for it
+        pending = collect_summary_update("thread", state)
+        await asyncio.sleep(0.01)
+        return pending, collect_summary_update("thread", state)
+
+    pending, landed = asyncio.run(turns())
+    assert pending == {}
+    assert landed == {"conversation_summary": "the user asked questions", "summarized_message_count": 4}
+
+    async def stale():
+        start_summary_update("moved-on", state)
+        await asyncio.sleep(0.01)
+        # Another process summarized the thread in the meantime
+        return collect_summary_update("moved-on", {**state, "summarized_message_count": 2})
+
+    assert asyncio.run(stale()) == {}
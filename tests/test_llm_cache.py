@@ -0,0 +1,47 @@
+"""
+tests/test_llm_cache.py
+Semantic tier of the LLM cache: near-duplicate prompts must agree on their slot values to match.
+"""
+
+import numpy as np
+from langchain_core.load import dumps
+from langchain_core.messages import HumanMessage
+from langchain_core.outputs import Generation
+
+import app.llm_cache as llm_cache_module
+from app.llm_cache import LLMCache
+
+LLM_STRING = "planner---[('response_format', 'Plan')]"
+
+
+class SameVector:
+    """Embeds every text to the same vector: any two prompts in a scope are near-duplicates"""
+
+    def encode(self, texts, **kwargs):
+        return np.ones((len(texts), 4), dtype=np.float32) / 2
+
+
+def prompt(text: str) -> str:
+    return dumps([HumanMessage(content=text)])
+
+
+def make_cache(monkeypatch) -> LLMCache:
+    monkeypatch.setattr(llm_cache_module, "_get_embedding_model", lambda: SameVector())
+    cache = LLMCache(semantic=True, threshold=0.95, path="")
+    cache.update(prompt("Book a demo Wednesday 11:00 AM"), LLM_STRING, [Generation(text="wednesday plan")])
+    return cache
+
+
+def test_near_duplicate_with_different_slots_misses(monkeypatch):
+    cache = make_cache(monkeypatch)
+
+    assert cache.lookup(prompt("Book a demo Tuesday 10:00 AM"), LLM_STRING) is None
+    assert cache.lookup(prompt("Book a demo Wednesday 10:00 AM"), LLM_STRING) is None
+
+
+def test_near_duplicate_with_same_slots_hits(monkeypatch):
+    cache = make_cache(monkeypatch)
+
+    hit = cache.lookup(prompt("Please book a demo on Wednesday 11:00 AM"), LLM_STRING)
+    assert hit is not None and hit[0].text == "wednesday plan"
+    assert cache.counters["semantic_hits"] == 1
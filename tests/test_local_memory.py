@@ -0,0 +1,55 @@
+"""
+tests/test_local_memory.py
+Crash recovery of the local memory shards: vectors and records must stay paired row for row.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from app.local_memory import Shard
+
+DIM = 3
+
+
+def record(record_id: str, text: str):
+    return {"id": record_id, "user_id": "u", "text": text}
+
+
+def test_orphan_vectors_without_records_file_are_dropped(tmp_path):
+    path = str(tmp_path / "shard")
+    os.makedirs(path)
+    # Crash after the first vectors append, before records.jsonl was created
+    with open(os.path.join(path, "vectors.f32"), "wb") as f:
+        f.write(np.array([[1, 0, 0]], dtype=np.float32).tobytes())
+
+    shard = Shard(path, DIM)
+    assert shard.snapshot == (None, [])
+    shard.append([record("a", "about cats")], np.array([[0, 1, 0]], dtype=np.float32))
+
+    reloaded = Shard(path, DIM)
+    assert reloaded.search(np.array([0, 1, 0], dtype=np.float32), 1) == ["about cats"]
+    assert float(reloaded.snapshot[0][0] @ np.array([0, 1, 0], dtype=np.float32)) == 1.0
+
+
+def test_orphan_records_are_cut_before_the_next_append(tmp_path):
+    path = str(tmp_path / "shard")
+    shard = Shard(path, DIM)
+    shard.append([record("a", "A")], np.array([[1, 0, 0]], dtype=np.float32))
+    # Crash between the two writes of a later append, the other way round
+    with open(os.path.join(path, "records.jsonl"), "a", encoding="utf-8") as f:
+        f.write(json.dumps(record("o", "ORPHAN")) + "\n")
+
+    Shard(path, DIM).append([record("b", "B")], np.array([[0, 1, 0]], dtype=np.float32))
+
+    assert Shard(path, DIM).search(np.array([0, 1, 0], dtype=np.float32), 1) == ["B"]
+
+
+def test_retried_batch_is_not_duplicated(tmp_path):
+    shard = Shard(str(tmp_path / "shard"), DIM)
+    batch = [record("a", "A")]
+    shard.append(batch, np.array([[1, 0, 0]], dtype=np.float32))
+    shard.append(batch, np.array([[1, 0, 0]], dtype=np.float32))
+
+    assert len(Shard(shard.path, DIM).snapshot[1]) == 1